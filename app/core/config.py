@@ -1,3 +1,49 @@
 import os
 DATABASE_URL = os.getenv("DATABASE_URL", "")
-DGIS_KEY = os.getenv("DGIS_KEY", "")
\ No newline at end of file
+DGIS_KEY = os.getenv("DGIS_KEY", "")
+
+# Сколько строк CSV вставляется одним INSERT ... ON CONFLICT
+INGEST_BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", "1000"))
+
+# Сколько фоновых загрузок CSV может идти одновременно в одном процессе
+INGEST_MAX_JOBS = int(os.getenv("INGEST_MAX_JOBS", "2"))
+
+# Кэш геокодирования 2GIS
+GEOCODE_TTL_DAYS = int(os.getenv("GEOCODE_TTL_DAYS", "30"))
+GEOCODE_NEGATIVE_TTL_HOURS = int(os.getenv("GEOCODE_NEGATIVE_TTL_HOURS", "24"))
+GEOCODE_MEMORY_SIZE = int(os.getenv("GEOCODE_MEMORY_SIZE", "50000"))
+
+# Как часто (сек) процесс сверяет отпечаток таблицы offices со своим индексом
+OFFICE_INDEX_REFRESH_SEC = int(os.getenv("OFFICE_INDEX_REFRESH_SEC", "60"))
+
+# Как часто (сек) индекс назначения сверяет состав менеджеров
+ASSIGNMENT_INDEX_REFRESH_SEC = int(os.getenv("ASSIGNMENT_INDEX_REFRESH_SEC", "30"))
+
+# Сколько секунд держать посчитанный total для одинаковых фильтров /api/tickets
+TICKETS_COUNT_CACHE_SEC = int(os.getenv("TICKETS_COUNT_CACHE_SEC", "30"))
+
+# Пул соединений с БД (на процесс и на каждый движок — sync и async)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+
+# Исходящий HTTP (2GIS и др.): пул соединений, повторы, circuit breaker
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", "20"))
+HTTP_RETRIES = int(os.getenv("HTTP_RETRIES", "2"))
+HTTP_BACKOFF_BASE_SEC = float(os.getenv("HTTP_BACKOFF_BASE_SEC", "0.2"))
+HTTP_BACKOFF_MAX_SEC = float(os.getenv("HTTP_BACKOFF_MAX_SEC", "2"))
+HTTP_BREAKER_FAILURES = int(os.getenv("HTTP_BREAKER_FAILURES", "5"))
+HTTP_BREAKER_RESET_SEC = float(os.getenv("HTTP_BREAKER_RESET_SEC", "30"))
+
+# Сколько запросов к 2GIS одновременно может делать один процесс
+DGIS_MAX_CONCURRENCY = int(os.getenv("DGIS_MAX_CONCURRENCY", "10"))
+DGIS_TIMEOUT_SEC = float(os.getenv("DGIS_TIMEOUT_SEC", "10"))
+
+# Процессов для очистки CSV перед загрузкой (upload-csv?clean=true); 1 — в потоке задачи
+INGEST_CLEAN_WORKERS = int(os.getenv("INGEST_CLEAN_WORKERS", "1"))
+
+# Как часто (сек) консьюмер пишет снимки своих счётчиков в process_metrics;
+# снимки старше METRICS_STALE_SEC в /api/metrics не показываются
+METRICS_REPORT_SEC = int(os.getenv("METRICS_REPORT_SEC", "15"))
+METRICS_STALE_SEC = int(os.getenv("METRICS_STALE_SEC", "300"))
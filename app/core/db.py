@@ -1,18 +1,48 @@
 import os
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
+from app.core.config import DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT
 from app.modules.tickets.models import Base
 
 
+# Произвольная константа: ключ advisory lock для create_all
+SCHEMA_LOCK_KEY = 727_000
+
 DATABASE_URL = os.getenv(
     "DATABASE_URL",
     "postgresql://postgres:postgres@db:5432/datasaur",
 )
 
-engine = create_engine(DATABASE_URL, pool_pre_ping=True)
+engine = create_engine(
+    DATABASE_URL,
+    pool_pre_ping=True,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+)
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
 
+# Асинхронный движок для эндпоинтов API: psycopg 3 умеет async сам,
+# поэтому драйвер тот же, меняется только схема URL.
+ASYNC_DATABASE_URL = make_url(DATABASE_URL).set(drivername="postgresql+psycopg")
+
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    pool_pre_ping=True,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+)
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
 
 def get_db():
     db = SessionLocal()
@@ -22,5 +52,18 @@ def get_db():
         db.close()
 
 
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
 def init_db():
-    Base.metadata.create_all(bind=engine)
\ No newline at end of file
+    from app.db.migrations.runner import run_migrations
+
+    # воркеры стартуют одновременно: create_all под блокировкой, иначе
+    # двое могут попытаться создать одну и ту же таблицу
+    with engine.begin() as conn:
+        conn.execute(text("SELECT pg_advisory_xact_lock(:k)"), {"k": SCHEMA_LOCK_KEY})
+        Base.metadata.create_all(bind=conn)
+
+    run_migrations(engine)
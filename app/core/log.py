@@ -0,0 +1,6 @@
+import threading
+from datetime import datetime
+
+
+def log(msg):
+    print(f"[{datetime.utcnow().isoformat()}] [{threading.current_thread().name}] {msg}", flush=True)
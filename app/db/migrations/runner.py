@@ -0,0 +1,132 @@
+"""Минимальный раннер миграций схемы.
+
+    python -m app.db.migrations.runner          # применить новые
+    python -m app.db.migrations.runner status   # показать состояние
+
+Миграции — модули app/db/migrations/versions/mNNNN_*.py, применяются по
+порядку номера, применённые записываются в schema_migrations. Модуль
+объявляет:
+
+    STATEMENTS — DDL, выполняется в одной транзакции;
+    run(conn)  — необязательный код (бэкфилл данных), в той же транзакции;
+    INDEXES    — [(имя, CREATE INDEX CONCURRENTLY ...)], строятся вне
+                 транзакции и не блокируют запись в таблицу.
+
+Одновременно мигрирует только один процесс (pg_advisory_lock), остальные
+ждут и затем видят, что всё уже применено.
+"""
+import importlib
+import pkgutil
+import sys
+import time
+
+from sqlalchemy import text
+
+from app.db.migrations import versions
+
+# Произвольная константа: ключ advisory lock для миграций
+MIGRATIONS_LOCK_KEY = 727_001
+
+
+def _load_migrations():
+    modules = []
+    for info in pkgutil.iter_modules(versions.__path__):
+        if info.name.startswith("m") and info.name[1:5].isdigit():
+            modules.append(importlib.import_module(f"{versions.__name__}.{info.name}"))
+    return sorted(modules, key=lambda m: m.__name__)
+
+
+def _version(module) -> str:
+    return module.__name__.rsplit(".", 1)[-1]
+
+
+def _ensure_table(conn):
+    conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version    VARCHAR(100) PRIMARY KEY,
+            applied_at TIMESTAMP NOT NULL DEFAULT now()
+        )
+    """))
+
+
+def _applied(conn) -> set:
+    return set(conn.execute(text("SELECT version FROM schema_migrations")).scalars())
+
+
+def _build_index(autocommit_conn, name: str, sql: str):
+    # Упавший CREATE INDEX CONCURRENTLY оставляет невалидный индекс,
+    # который IF NOT EXISTS молча пропустит — удаляем его и строим заново.
+    invalid = autocommit_conn.execute(text("""
+        SELECT 1
+        FROM pg_index i
+        JOIN pg_class c ON c.oid = i.indexrelid
+        WHERE c.relname = :name AND NOT i.indisvalid
+    """), {"name": name}).first()
+
+    if invalid:
+        autocommit_conn.execute(text(f'DROP INDEX CONCURRENTLY IF EXISTS "{name}"'))
+
+    autocommit_conn.execute(text(sql))
+
+
+def run_migrations(engine, log=print) -> list:
+    """Применяет все ещё не применённые миграции, возвращает их версии."""
+    done = []
+
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as lock_conn:
+        lock_conn.execute(text("SELECT pg_advisory_lock(:k)"), {"k": MIGRATIONS_LOCK_KEY})
+        try:
+            _ensure_table(lock_conn)
+            applied = _applied(lock_conn)
+
+            for module in _load_migrations():
+                version = _version(module)
+                if version in applied:
+                    continue
+
+                started = time.perf_counter()
+
+                statements = getattr(module, "STATEMENTS", [])
+                run = getattr(module, "run", None)
+                if statements or run:
+                    with engine.begin() as conn:
+                        for sql in statements:
+                            conn.execute(text(sql))
+                        if run:
+                            run(conn)
+
+                with engine.connect().execution_options(
+                    isolation_level="AUTOCOMMIT"
+                ) as conn:
+                    for name, sql in getattr(module, "INDEXES", []):
+                        _build_index(conn, name, sql)
+
+                lock_conn.execute(
+                    text("INSERT INTO schema_migrations (version) VALUES (:v)"),
+                    {"v": version},
+                )
+                done.append(version)
+                log(f"Applied migration {version} "
+                    f"in {(time.perf_counter() - started) * 1000:.0f} ms")
+        finally:
+            lock_conn.execute(text("SELECT pg_advisory_unlock(:k)"), {"k": MIGRATIONS_LOCK_KEY})
+
+    return done
+
+
+def status(engine):
+    with engine.begin() as conn:
+        _ensure_table(conn)
+        applied = _applied(conn)
+    return [(_version(m), _version(m) in applied) for m in _load_migrations()]
+
+
+if __name__ == "__main__":
+    from app.core.db import engine
+
+    if len(sys.argv) > 1 and sys.argv[1] == "status":
+        for version, is_applied in status(engine):
+            print(f"{'[x]' if is_applied else '[ ]'} {version}")
+    else:
+        applied = run_migrations(engine)
+        print(f"{len(applied)} migration(s) applied")
@@ -0,0 +1,5 @@
+"""tickets.analysis_source: create_all не добавляет колонки в существующие таблицы."""
+
+STATEMENTS = [
+    "ALTER TABLE tickets ADD COLUMN IF NOT EXISTS analysis_source VARCHAR(20)",
+]
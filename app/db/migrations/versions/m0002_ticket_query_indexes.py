@@ -0,0 +1,51 @@
+"""Индексы под фильтры и сортировку /api/tickets и JOIN-ы списка.
+
+Список всегда фильтрует по диапазону priority и сортирует по
+(priority DESC, id DESC), поэтому каждый индекс заканчивается этой парой:
+фильтр по равенству + готовый порядок + keyset-курсор. Тикеты без
+приоритета (ещё не обработанные) в список не попадают — индексы частичные.
+"""
+
+INDEXES = [
+    (
+        "ix_tickets_priority_id",
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_tickets_priority_id "
+        "ON tickets (priority DESC, id DESC) "
+        "WHERE priority IS NOT NULL",
+    ),
+    (
+        "ix_tickets_type_priority_id",
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_tickets_type_priority_id "
+        "ON tickets (ticket_type, priority DESC, id DESC) "
+        "WHERE priority IS NOT NULL",
+    ),
+    (
+        "ix_tickets_language_priority_id",
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_tickets_language_priority_id "
+        "ON tickets (language, priority DESC, id DESC) "
+        "WHERE priority IS NOT NULL",
+    ),
+    (
+        "ix_tickets_office_priority_id",
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_tickets_office_priority_id "
+        "ON tickets (assigned_office_id, priority DESC, id DESC) "
+        "WHERE priority IS NOT NULL",
+    ),
+    # FK без индекса: JOIN менеджера в списке/деталях
+    (
+        "ix_tickets_assigned_manager_id",
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_tickets_assigned_manager_id "
+        "ON tickets (assigned_manager_id) "
+        "WHERE assigned_manager_id IS NOT NULL",
+    ),
+    (
+        "ix_managers_office_id",
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_managers_office_id "
+        "ON managers (office_id)",
+    ),
+    (
+        "idx_offices_location",
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_offices_location "
+        "ON offices USING gist (location)",
+    ),
+]
@@ -0,0 +1,53 @@
+"""Первичное заполнение ticket_stats из уже загруженных тикетов.
+
+Саму таблицу создаёт create_all; дальше счётчики ведут загрузка CSV
+и консьюмер. SQL — снимок stats.rebuild на момент миграции: код
+приложения может измениться, а применённая миграция — нет.
+"""
+
+STATEMENTS = [
+    "LOCK TABLE ticket_stats IN SHARE ROW EXCLUSIVE MODE",
+    "DELETE FROM ticket_stats",
+    """
+    WITH g AS (
+        SELECT
+            GROUPING(t.ticket_type) = 0 AS g_type,
+            GROUPING(t.language)    = 0 AS g_language,
+            GROUPING(t.tone)        = 0 AS g_tone,
+            GROUPING(t.segment)     = 0 AS g_segment,
+            GROUPING(o.city)        = 0 AS g_office,
+            t.ticket_type, t.language, t.tone, t.segment, o.city,
+            count(*)                                        AS n,
+            count(*) FILTER (WHERE t.status = 'DONE')       AS done,
+            count(t.priority) FILTER (WHERE t.status = 'DONE') AS priority_n,
+            coalesce(sum(t.priority) FILTER (WHERE t.status = 'DONE'), 0) AS priority_sum
+        FROM tickets t
+        LEFT JOIN offices o ON o.id = t.assigned_office_id
+        GROUP BY GROUPING SETS (
+            (), (t.ticket_type), (t.language), (t.tone), (t.segment), (o.city)
+        )
+    ),
+    grand AS (
+        SELECT * FROM g
+        WHERE NOT (g_type OR g_language OR g_tone OR g_segment OR g_office)
+    )
+    INSERT INTO ticket_stats (dimension, value, count, priority_sum)
+    SELECT dimension, value, count, priority_sum
+    FROM (
+        SELECT 'total' AS dimension, '' AS value, n AS count, 0 AS priority_sum FROM grand
+        UNION ALL
+        SELECT 'priority', '', priority_n, priority_sum FROM grand WHERE priority_n > 0
+        UNION ALL
+        SELECT 'type', ticket_type, done, 0 FROM g WHERE g_type
+        UNION ALL
+        SELECT 'language', language, done, 0 FROM g WHERE g_language
+        UNION ALL
+        SELECT 'tone', tone, done, 0 FROM g WHERE g_tone
+        UNION ALL
+        SELECT 'segment', segment, n, 0 FROM g WHERE g_segment
+        UNION ALL
+        SELECT 'office', city, done, 0 FROM g WHERE g_office
+    ) AS rows
+    WHERE dimension IN ('total', 'priority') OR (value <> '' AND count > 0)
+    """,
+]
@@ -0,0 +1,42 @@
+"""Уникальное имя менеджера — ключ для upsert в seed_managers.
+
+Параллельные старты раньше могли вставить одного менеджера дважды:
+дубликаты схлопываются в самую раннюю запись, тикеты и workload
+переносятся на неё.
+"""
+
+_DUPLICATES = """
+    SELECT id, first_value(id) OVER (PARTITION BY name ORDER BY id) AS keep_id
+    FROM managers
+"""
+
+STATEMENTS = [
+    f"""
+    UPDATE tickets t SET assigned_manager_id = d.keep_id
+    FROM ({_DUPLICATES}) d
+    WHERE t.assigned_manager_id = d.id AND d.id <> d.keep_id
+    """,
+    f"""
+    UPDATE managers m SET workload = s.total
+    FROM (
+        SELECT d.keep_id, sum(coalesce(m2.workload, 0)) AS total
+        FROM ({_DUPLICATES}) d JOIN managers m2 ON m2.id = d.id
+        GROUP BY d.keep_id
+        HAVING count(*) > 1
+    ) s
+    WHERE m.id = s.keep_id
+    """,
+    f"""
+    DELETE FROM managers m
+    USING ({_DUPLICATES}) d
+    WHERE m.id = d.id AND d.id <> d.keep_id
+    """,
+]
+
+INDEXES = [
+    (
+        "uq_managers_name",
+        "CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS uq_managers_name "
+        "ON managers (name)",
+    ),
+]
@@ -0,0 +1,10 @@
+"""Состояние обработки тикета: попытки, ошибка, чекпоинт этапов.
+
+error_message консьюмер писал и раньше, но колонки не было.
+"""
+
+STATEMENTS = [
+    "ALTER TABLE tickets ADD COLUMN IF NOT EXISTS attempts INTEGER DEFAULT 0",
+    "ALTER TABLE tickets ADD COLUMN IF NOT EXISTS error_message TEXT",
+    "ALTER TABLE tickets ADD COLUMN IF NOT EXISTS checkpoint JSONB",
+]
@@ -0,0 +1,5 @@
+"""tickets.claimed_at: аренда PROCESSING для атомарного захвата тикета консьюмером."""
+
+STATEMENTS = [
+    "ALTER TABLE tickets ADD COLUMN IF NOT EXISTS claimed_at TIMESTAMP",
+]
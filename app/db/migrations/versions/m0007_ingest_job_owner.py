@@ -0,0 +1,6 @@
+"""ingest_jobs.path / owner: поиск задач и файлов, брошенных рестартом."""
+
+STATEMENTS = [
+    "ALTER TABLE ingest_jobs ADD COLUMN IF NOT EXISTS path VARCHAR(500)",
+    "ALTER TABLE ingest_jobs ADD COLUMN IF NOT EXISTS owner VARCHAR(100)",
+]
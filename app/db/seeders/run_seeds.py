@@ -1,17 +1,90 @@
+import hashlib
+import json
+import time
+
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
 from app.core.db import SessionLocal, init_db
-from app.db.seeders.seed_offices import seed_offices
-from app.db.seeders.seed_managers import seed_managers
+from app.db.seeders.seed_offices import OFFICES, seed_offices
+from app.db.seeders.seed_managers import MANAGERS, seed_managers
+from app.modules.assignment.index import assignment_index
+from app.modules.geo.office_index import office_index
+from app.modules.tickets.models import SeedState
 
+# Произвольная константа: ключ advisory lock для сидов
+SEED_LOCK_KEY = 727_002
 
-def run():
+# порядок важен: менеджеры ссылаются на офисы
+SEEDS = [
+    ("offices", OFFICES, seed_offices),
+    ("managers", MANAGERS, seed_managers),
+]
+
+
+def fingerprint(data) -> str:
+    raw = json.dumps(data, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def seed_all(db: Session) -> dict:
+    """Применяет изменившиеся сиды, возвращает {имя: applied | skipped}.
+
+    Сид пропускается, если отпечаток его данных совпадает с записанным в
+    seed_state. Всё идёт в одной транзакции под pg_advisory_xact_lock:
+    при старте нескольких воркеров сидирует первый, остальные дожидаются
+    его коммита и видят совпавшие отпечатки.
+    """
+    db.execute(text("SELECT pg_advisory_xact_lock(:k)"), {"k": SEED_LOCK_KEY})
+
+    stored = dict(db.execute(text("SELECT name, fingerprint FROM seed_state")).all())
+    result = {}
+
+    for name, data, seed in SEEDS:
+        fp = fingerprint(data)
+        if stored.get(name) == fp:
+            result[name] = "skipped"
+            continue
+
+        seed(db)
+
+        stmt = pg_insert(SeedState).values(name=name, fingerprint=fp)
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=[SeedState.name],
+            set_={"fingerprint": stmt.excluded.fingerprint, "applied_at": text("now()")},
+        ))
+        result[name] = "applied"
+
+    db.commit()
+
+    if result["offices"] == "applied":
+        office_index.invalidate()
+    if result["managers"] == "applied":
+        assignment_index.invalidate()
+
+    return result
+
+
+def startup(log=print) -> dict:
+    """init_db + сиды с замером времени холодного старта."""
+    started = time.perf_counter()
     init_db()
-    db = SessionLocal()
-    try:
-        seed_offices(db)
-        seed_managers(db)
-    finally:
-        db.close()
+    schema_ms = (time.perf_counter() - started) * 1000
+
+    seeded_at = time.perf_counter()
+    with SessionLocal() as db:
+        result = seed_all(db)
+    seed_ms = (time.perf_counter() - seeded_at) * 1000
+
+    log(f"Startup: schema {schema_ms:.0f} ms, seeds {seed_ms:.0f} ms "
+        f"({', '.join(f'{k} {v}' for k, v in result.items())})")
+    return {"schema_ms": round(schema_ms, 1), "seed_ms": round(seed_ms, 1), **result}
+
+
+def run():
+    startup()
 
 
 if __name__ == "__main__":
-    run()
\ No newline at end of file
+    run()
@@ -1,3 +1,5 @@
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
 from app.modules.tickets.models import Manager, Office
 
@@ -109,33 +111,35 @@ MANAGERS = [
 ]
 
 
-
 def seed_managers(db: Session):
-
-    for name, position, city, skills_str, workload in MANAGERS:
-
-        office = db.query(Office).filter_by(city=city).first()
-        if not office:
-            continue
-
-        skills = [s.strip() for s in skills_str.split(",")]
-
-        existing = db.query(Manager).filter_by(name=name).first()
-
-        if existing:
-            existing.position = position
-            existing.skills = skills
-            existing.workload = workload
-            existing.office_id = office.id
-        else:
-            manager = Manager(
-                name=name,
-                position=position,
-                skills=skills,
-                workload=workload,
-                office_id=office.id
-            )
-            db.add(manager)
-
-    db.commit()
-
+    """Один upsert по имени для всех менеджеров; коммитит вызывающий.
+
+    workload задаётся только при вставке: у существующих менеджеров это
+    живой счётчик назначений, повторный сид его не сбрасывает.
+    """
+    office_ids = dict(db.execute(select(Office.city, Office.id)).all())
+
+    rows = [
+        {
+            "name": name,
+            "position": position,
+            "skills": [s.strip() for s in skills_str.split(",")],
+            "workload": workload,
+            "office_id": office_ids[city],
+        }
+        for name, position, city, skills_str, workload in MANAGERS
+        if city in office_ids
+    ]
+    if not rows:
+        return
+
+    stmt = pg_insert(Manager).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Manager.name],
+        set_={
+            "position": stmt.excluded.position,
+            "skills": stmt.excluded.skills,
+            "office_id": stmt.excluded.office_id,
+        },
+    )
+    db.execute(stmt)
\ No newline at end of file
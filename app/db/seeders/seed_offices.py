@@ -1,5 +1,6 @@
 from geoalchemy2.shape import from_shape
 from shapely import wkb
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
 
 from app.modules.tickets.models import Office
@@ -23,22 +24,22 @@ OFFICES = [
 ]
 
 def seed_offices(db: Session):
-
-    for city, address, wkb_hex in OFFICES:
-
-        existing = db.query(Office).filter_by(city=city).first()
-
-        geom = wkb.loads(bytes.fromhex(wkb_hex))
-
-        if existing:
-            existing.address = address
-            existing.location = from_shape(geom, srid=4326)
-        else:
-            office = Office(
-                city=city,
-                address=address,
-                location=from_shape(geom, srid=4326)
-            )
-            db.add(office)
-
-    db.commit()
\ No newline at end of file
+    """Один upsert по city для всех офисов; коммитит вызывающий."""
+    rows = [
+        {
+            "city": city,
+            "address": address,
+            "location": from_shape(wkb.loads(bytes.fromhex(wkb_hex)), srid=4326),
+        }
+        for city, address, wkb_hex in OFFICES
+    ]
+
+    stmt = pg_insert(Office).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Office.city],
+        set_={
+            "address": stmt.excluded.address,
+            "location": stmt.excluded.location,
+        },
+    )
+    db.execute(stmt)
\ No newline at end of file
@@ -0,0 +1,85 @@
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+
+class MicroBatcher:
+    """Собирает одиночные запросы из разных потоков в пачки.
+
+    Пачка уходит в handler(items) -> {id: result | Exception}, как только набралось
+    max_size элементов или с момента первого элемента прошло max_wait
+    секунд. Вызывающий поток блокируется в submit() до результата.
+
+    До workers пачек обрабатываются одновременно; пока все заняты, новые
+    элементы копятся и уходят следующей пачкой.
+    """
+
+    def __init__(self, handler, max_size: int, max_wait: float,
+                 name: str = "batcher", workers: int = 1):
+        self._handler = handler
+        self._max_size = max_size
+        self._max_wait = max_wait
+        self._cond = threading.Condition()
+        self._pending = []
+        self._first_at = None
+
+        self._slots = threading.BoundedSemaphore(workers)
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=name)
+
+        self._thread = threading.Thread(target=self._loop, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, item: dict):
+        future = Future()
+        with self._cond:
+            if not self._pending:
+                self._first_at = time.monotonic()
+            self._pending.append((item, future))
+            # первый элемент будит цикл, чтобы тот засёк max_wait
+            if len(self._pending) == 1 or len(self._pending) >= self._max_size:
+                self._cond.notify()
+        return future.result()
+
+    def _take_batch(self):
+        with self._cond:
+            while True:
+                if not self._pending:
+                    self._cond.wait()
+                    continue
+
+                left = self._first_at + self._max_wait - time.monotonic()
+                if len(self._pending) >= self._max_size or left <= 0:
+                    break
+                self._cond.wait(timeout=left)
+
+            batch = self._pending[:self._max_size]
+            self._pending = self._pending[self._max_size:]
+            self._first_at = time.monotonic() if self._pending else None
+            return batch
+
+    def _loop(self):
+        while True:
+            # пачку берём, только когда есть свободный обработчик
+            self._slots.acquire()
+            batch = self._take_batch()
+            self._pool.submit(self._run, batch)
+
+    def _run(self, batch):
+        try:
+            items = [item for item, _ in batch]
+
+            try:
+                results = self._handler(items)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                return
+
+            for item, future in batch:
+                result = results.get(item["id"], KeyError(f"no result for {item['id']}"))
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+        finally:
+            self._slots.release()
@@ -0,0 +1,194 @@
+import hashlib
+import os
+import re
+import threading
+import time
+from collections import Counter, OrderedDict
+from datetime import datetime
+
+from sqlalchemy import select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app.core.db import SessionLocal
+from app.modules.tickets.models import AnalysisCache
+from app.infrastructure.ai.ollama_client import PROMPT_VERSION
+
+# Сколько результатов держать в памяти процесса
+LLM_CACHE_SIZE = int(os.getenv("LLM_CACHE_SIZE", "10000"))
+
+# Счётчики попаданий пишутся в Postgres пачками, а не на каждый hit
+_HITS_FLUSH_EVERY = 100
+_HITS_FLUSH_SEC = 30
+
+_RESULT_KEYS = (
+    "ticket_type", "tone", "priority", "language", "summary", "recommendation",
+)
+
+_WS = re.compile(r"\s+")
+
+
+def _norm(value) -> str:
+    if value is None:
+        return ""
+    return _WS.sub(" ", str(value)).strip().lower()
+
+
+def cache_key(desc, segment, country, region) -> str:
+    raw = "\x1f".join(_norm(v) for v in (desc, segment, country, region))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class AnalysisCacheStore:
+    """Двухуровневый кэш результатов анализа: LRU в памяти + таблица analysis_cache.
+
+    Таблица общая для всех реплик консьюмера и переживает рестарты.
+    Записи другой PROMPT_VERSION (сменился промпт или модель) игнорируются
+    и перезаписываются при следующем анализе.
+    """
+
+    def __init__(self, max_size: int = LLM_CACHE_SIZE, version: str = PROMPT_VERSION):
+        self._max_size = max_size
+        self._version = version
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()   # key -> (result, tokens)
+        self._pending_hits = Counter()
+        self._last_flush = time.monotonic()
+
+        self._memory_hits = 0
+        self._db_hits = 0
+        self._misses = 0
+        self._tokens_saved = 0
+
+    def _remember(self, key, result, tokens):
+        self._memory[key] = (result, tokens)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self._max_size:
+            self._memory.popitem(last=False)
+
+    def get(self, desc, segment, country, region):
+        key = cache_key(desc, segment, country, region)
+
+        with self._lock:
+            cached = self._memory.get(key)
+            if cached is not None:
+                self._memory.move_to_end(key)
+                self._memory_hits += 1
+                self._tokens_saved += cached[1]
+                self._pending_hits[key] += 1
+                flush = self._should_flush()
+                result = dict(cached[0])
+            else:
+                flush = False
+                result = None
+
+        if result is not None:
+            if flush:
+                self.flush_hits()
+            return result
+
+        with SessionLocal() as db:
+            row = db.execute(
+                select(AnalysisCache.result, AnalysisCache.tokens)
+                .where(AnalysisCache.key == key,
+                       AnalysisCache.version == self._version)
+            ).first()
+
+        with self._lock:
+            if row is None:
+                self._misses += 1
+                return None
+
+            self._remember(key, row.result, row.tokens or 0)
+            self._db_hits += 1
+            self._tokens_saved += row.tokens or 0
+            self._pending_hits[key] += 1
+            flush = self._should_flush()
+
+        if flush:
+            self.flush_hits()
+        return dict(row.result)
+
+    def put(self, desc, segment, country, region, result: dict):
+        # fallback-результаты не кэшируем: это не ответ модели
+        if result.get("source") != "llm":
+            return
+
+        key = cache_key(desc, segment, country, region)
+        payload = {k: result.get(k) for k in _RESULT_KEYS}
+        tokens = int(result.get("tokens") or 0)
+
+        with self._lock:
+            self._remember(key, payload, tokens)
+
+        stmt = pg_insert(AnalysisCache).values(
+            key=key,
+            version=self._version,
+            result=payload,
+            tokens=tokens,
+            hits=0,
+            created_at=datetime.utcnow(),
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[AnalysisCache.key],
+            set_={
+                "version": stmt.excluded.version,
+                "result": stmt.excluded.result,
+                "tokens": stmt.excluded.tokens,
+                "hits": 0,
+                "created_at": stmt.excluded.created_at,
+            },
+        )
+        with SessionLocal() as db:
+            db.execute(stmt)
+            db.commit()
+
+    def _should_flush(self) -> bool:
+        return (
+            sum(self._pending_hits.values()) >= _HITS_FLUSH_EVERY
+            or time.monotonic() - self._last_flush >= _HITS_FLUSH_SEC
+        )
+
+    def flush_hits(self):
+        with self._lock:
+            pending = self._pending_hits
+            self._pending_hits = Counter()
+            self._last_flush = time.monotonic()
+
+        if not pending:
+            return
+
+        now = datetime.utcnow()
+        with SessionLocal() as db:
+            for key, hits in pending.items():
+                db.execute(
+                    update(AnalysisCache)
+                    .where(AnalysisCache.key == key)
+                    .values(hits=AnalysisCache.hits + hits, last_hit_at=now)
+                )
+            db.commit()
+
+    def purge_stale(self) -> int:
+        """Удаляет записи, посчитанные старым промптом или моделью."""
+        with SessionLocal() as db:
+            deleted = db.query(AnalysisCache).filter(
+                AnalysisCache.version != self._version
+            ).delete(synchronize_session=False)
+            db.commit()
+        return deleted
+
+    def stats(self) -> dict:
+        with self._lock:
+            hits = self._memory_hits + self._db_hits
+            lookups = hits + self._misses
+            return {
+                "version": self._version,
+                "memory_entries": len(self._memory),
+                "memory_hits": self._memory_hits,
+                "db_hits": self._db_hits,
+                "misses": self._misses,
+                "hit_ratio": round(hits / lookups, 3) if lookups else None,
+                "tokens_saved": self._tokens_saved,
+            }
+
+
+analysis_cache = AnalysisCacheStore()
@@ -1,5 +1,7 @@
 import os
 import json
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
 import google as genai
 
 genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
@@ -16,10 +18,57 @@ VALID_TONES = {'Позитивный', 'Нейтральный', 'Негатив
 VALID_LANGS = {'RU', 'KZ', 'ENG'}
 
 
-def analyze_ticket(desc: str, segment: str, country: str, region: str) -> dict:
-    """Анализирует тикет через Gemini API и возвращает словарь с полями анализа."""
+_INSTRUCTIONS = (
+    "Типы (выбери один):\n"
+    "- Жалоба: недовольство сервисом или сотрудником\n"
+    "- Претензия: потеря денег, неверное списание\n"
+    "- Смена данных: изменить телефон, email, адрес\n"
+    "- Консультация: вопрос как что-то сделать\n"
+    "- Неработоспособность приложения: баг, ошибка, не грузится\n"
+    "- Мошеннические действия: взлом, чужой вход, подозрительная операция\n"
+    "- Спам: реклама, не связана с Freedom Broker\n\n"
+
+    "Тональность: Позитивный / Нейтральный / Негативный\n\n"
+
+    "Приоритет 1-10:\n"
+    "9-10: мошенничество, пропажа денег, взлом\n"
+    "7-8: не работает приложение, нельзя провести операцию\n"
+    "5-6: жалоба без потерь\n"
+    "3-4: консультация, смена данных\n"
+    "1-2: спам\n\n"
+
+    "Язык — определяй ТОЛЬКО по тексту обращения, не по стране:\n"
+    "RU — если текст на русском\n"
+    "KZ — если текст на казахском (қ, ң, ү, ғ, ө, ә, і, ұ)\n"
+    "ENG — если текст на английском\n\n"
+
+    "Примеры:\n"
+    'Обращение: "Купить акции Apple со скидкой!" -> тип: Спам, язык: RU\n'
+    'Обращение: "Кто-то зашёл в мой аккаунт и вывел деньги" -> тип: Мошеннические действия, язык: RU\n'
+    'Обращение: "Менің телефон нөмірімді өзгерту керек" -> тип: Смена данных, язык: KZ\n'
+    'Обращение: "How do I buy ETF?" -> тип: Консультация, язык: ENG\n\n'
+)
 
-    prompt = (
+_RESULT_FIELDS = (
+    '  "тип": "...",\n'
+    '  "тональность": "...",\n'
+    '  "приоритет": 5,\n'
+    '  "язык": "RU",\n'
+    '  "резюме": "1-2 предложения",\n'
+    '  "рекомендация": "действие менеджера"\n'
+)
+
+
+# Меняй при правке структуры промптов ниже — это сбросит кэш анализа
+PROMPT_REVISION = "1"
+
+PROMPT_VERSION = hashlib.sha256(
+    (MODEL + PROMPT_REVISION + _INSTRUCTIONS + _RESULT_FIELDS).encode("utf-8")
+).hexdigest()[:16]
+
+
+def _build_prompt(desc: str, segment: str, country: str, region: str) -> str:
+    return (
         "Ты классификатор обращений службы поддержки Freedom Broker.\n"
         "Верни ТОЛЬКО JSON, без пояснений.\n\n"
 
@@ -27,56 +76,144 @@ def analyze_ticket(desc: str, segment: str, country: str, region: str) -> dict:
         f"Страна/Регион: {country}, {region}\n"
         f"Обращение: {desc}\n\n"
 
-        "Типы (выбери один):\n"
-        "- Жалоба: недовольство сервисом или сотрудником\n"
-        "- Претензия: потеря денег, неверное списание\n"
-        "- Смена данных: изменить телефон, email, адрес\n"
-        "- Консультация: вопрос как что-то сделать\n"
-        "- Неработоспособность приложения: баг, ошибка, не грузится\n"
-        "- Мошеннические действия: взлом, чужой вход, подозрительная операция\n"
-        "- Спам: реклама, не связана с Freedom Broker\n\n"
-
-        "Тональность: Позитивный / Нейтральный / Негативный\n\n"
-
-        "Приоритет 1-10:\n"
-        "9-10: мошенничество, пропажа денег, взлом\n"
-        "7-8: не работает приложение, нельзя провести операцию\n"
-        "5-6: жалоба без потерь\n"
-        "3-4: консультация, смена данных\n"
-        "1-2: спам\n\n"
-
-        "Язык — определяй ТОЛЬКО по тексту обращения, не по стране:\n"
-        "RU — если текст на русском\n"
-        "KZ — если текст на казахском (қ, ң, ү, ғ, ө, ә, і, ұ)\n"
-        "ENG — если текст на английском\n\n"
-
-        "Примеры:\n"
-        'Обращение: "Купить акции Apple со скидкой!" -> тип: Спам, язык: RU\n'
-        'Обращение: "Кто-то зашёл в мой аккаунт и вывел деньги" -> тип: Мошеннические действия, язык: RU\n'
-        'Обращение: "Менің телефон нөмірімді өзгерту керек" -> тип: Смена данных, язык: KZ\n'
-        'Обращение: "How do I buy ETF?" -> тип: Консультация, язык: ENG\n\n'
+        + _INSTRUCTIONS +
 
         "Верни JSON:\n"
         "{\n"
-        '  "тип": "...",\n'
-        '  "тональность": "...",\n'
-        '  "приоритет": 5,\n'
-        '  "язык": "RU",\n'
-        '  "резюме": "1-2 предложения",\n'
-        '  "рекомендация": "действие менеджера"\n'
+        + _RESULT_FIELDS +
         "}"
     )
 
+
+def _build_batch_prompt(items: list) -> str:
+    tickets = [
+        {
+            "id": str(item["id"]),
+            "сегмент": item.get("segment"),
+            "страна_регион": f"{item.get('country')}, {item.get('region')}",
+            "обращение": item.get("desc"),
+        }
+        for item in items
+    ]
+    return (
+        "Ты классификатор обращений службы поддержки Freedom Broker.\n"
+        "Классифицируй КАЖДОЕ обращение из списка независимо от остальных.\n"
+        "Верни ТОЛЬКО JSON, без пояснений.\n\n"
+
+        + _INSTRUCTIONS +
+
+        "Обращения:\n"
+        + json.dumps(tickets, ensure_ascii=False) + "\n\n"
+
+        "Верни JSON-массив, по одному объекту на обращение, с тем же id:\n"
+        "[{\n"
+        '  "id": "...",\n'
+        + _RESULT_FIELDS +
+        "}]"
+    )
+
+
+def _parse_json(raw_text: str):
+    raw_text = raw_text.strip()
+    # модель иногда оборачивает ответ в ```json ... ```
+    if raw_text.startswith("```"):
+        raw_text = raw_text.strip("`")
+        if raw_text.startswith("json"):
+            raw_text = raw_text[4:]
+    return json.loads(raw_text)
+
+
+def analyze_ticket(desc: str, segment: str, country: str, region: str) -> dict:
+    """Анализирует тикет через Gemini API и возвращает словарь с полями анализа."""
+
+    if not desc or not desc.strip():
+        return _fallback(desc)
+
+    prompt = _build_prompt(desc, segment, country, region)
+
     try:
         response = client.models.generate_content(
             model=MODEL,
             contents=prompt)
-        raw_text = response.text.strip()
-        data = json.loads(raw_text)
+        data = _parse_json(response.text)
     except Exception as e:
         print(f"Error processing LLM response: {e}")
         return _fallback(desc)
 
+    result = _normalize(data, desc)
+    result['tokens'] = _token_count(response, prompt)
+    return result
+
+
+def analyze_tickets(items: list) -> dict:
+    """Классифицирует несколько тикетов одним вызовом модели.
+
+    items — список словарей с ключами id, desc, segment, country, region.
+    Возвращает {id: результат}. Каждый ответ проходит ту же валидацию,
+    что и в analyze_ticket; тикет, для которого модель не вернула
+    корректный объект, анализируется отдельным запросом.
+    """
+    results = {
+        item["id"]: _fallback(item.get("desc"))
+        for item in items
+        if not (item.get("desc") or "").strip()
+    }
+    items = [item for item in items if item["id"] not in results]
+
+    if not items:
+        return results
+
+    if len(items) == 1:
+        item = items[0]
+        results[item["id"]] = analyze_ticket(
+            item.get("desc"), item.get("segment"),
+            item.get("country"), item.get("region"),
+        )
+        return results
+
+    by_id = {str(item["id"]): item for item in items}
+    tokens_per_item = 0
+
+    try:
+        prompt = _build_batch_prompt(items)
+        response = client.models.generate_content(
+            model=MODEL,
+            contents=prompt)
+        data = _parse_json(response.text)
+        if not isinstance(data, list):
+            raise ValueError("batch response is not a JSON array")
+        tokens_per_item = _token_count(response, prompt) // len(items)
+    except Exception as e:
+        print(f"Error processing LLM batch response: {e}")
+        data = []
+
+    for entry in data:
+        if not isinstance(entry, dict):
+            continue
+        item = by_id.get(str(entry.get("id")))
+        if item is None or item["id"] in results:
+            continue
+        results[item["id"]] = _normalize(entry, item.get("desc"))
+        results[item["id"]]['tokens'] = tokens_per_item
+
+    # недостающие тикеты — отдельными запросами, параллельно
+    missing = [item for item in items if item["id"] not in results]
+    if missing:
+        with ThreadPoolExecutor(max_workers=len(missing)) as pool:
+            answers = pool.map(
+                lambda item: analyze_ticket(
+                    item.get("desc"), item.get("segment"),
+                    item.get("country"), item.get("region"),
+                ),
+                missing,
+            )
+            for item, answer in zip(missing, answers):
+                results[item["id"]] = answer
+
+    return results
+
+
+def _normalize(data: dict, desc: str) -> dict:
     ticket_type = data.get('тип', '')
     if ticket_type not in VALID_TYPES:
         ticket_type = 'Консультация'
@@ -102,9 +239,19 @@ def analyze_ticket(desc: str, segment: str, country: str, region: str) -> dict:
         'language':       language,
         'summary':        str(data.get('резюме', '')),
         'recommendation': str(data.get('рекомендация', '')),
+        'source':         'llm',
     }
 
 
+def _token_count(response, prompt: str) -> int:
+    usage = getattr(response, 'usage_metadata', None)
+    total = getattr(usage, 'total_token_count', None)
+    if total:
+        return int(total)
+    # грубая оценка, если API не вернул usage
+    return len(prompt) // 4
+
+
 def _fallback(desc: str) -> dict:
     return {
         'ticket_type':    'Консультация',
@@ -113,4 +260,5 @@ def _fallback(desc: str) -> dict:
         'language':       'RU',
         'summary':        desc[:150] if desc else '',
         'recommendation': 'Связаться с клиентом для уточнения деталей',
+        'source':         'fallback',
     }
\ No newline at end of file
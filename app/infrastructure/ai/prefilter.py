@@ -0,0 +1,193 @@
+import os
+import re
+
+# Порог уверенности, выше которого тикет классифицируется без LLM.
+# Значение > 1 фактически выключает быстрый путь.
+FASTPATH_THRESHOLD = float(os.getenv("FASTPATH_THRESHOLD", "0.9"))
+
+# Буквы, которых нет в русском алфавите
+_KZ_CHARS = set("қңүғөәіұһ")
+
+# Частые казахские слова без специфичных букв
+_KZ_WORDS = {"және", "мен", "керек", "жоқ", "бар", "сіз", "маған", "үшін", "ақша", "бойынша"}
+
+_CYRILLIC = re.compile(r"[а-яё]")
+_LATIN = re.compile(r"[a-z]")
+_WORD = re.compile(r"\w+")
+
+# Реклама / посторонние рассылки. Общие слова («бесплатно», «подписать»,
+# «ставка») встречаются и в вопросах клиентов — здесь только рекламные обороты.
+_SPAM_MARKERS = re.compile(
+    r"скидк|распродаж|промокод|заработ\w* (от|до|без)|казино|кредит без|"
+    r"переходи|жми|выигр|розыгрыш|только сегодня|специальн\w* цен|"
+    r"выгодн\w* предложени|в наличии|https?://|www\.|"
+    r"discount|promo|casino|click here|free money|subscribe",
+)
+
+# Упоминания брокера и продуктов — с ними тикет уже не «посторонний»
+_BROKER_MARKERS = re.compile(
+    r"freedom|фридом|брокер|broker|счет|счёт|портфел|вывод|пополн|"
+    r"приложени|аккаунт|account|тариф|ценн\w* бумаг|облигац|депозит",
+)
+
+_OPERATION = (
+    r"(спис|снял|сняли|перев[её]л|перевели|вывел|вывели|купил|купили|продал|продали|"
+    r"оформил|оформили|соверш|пров[её]л|провели|операци|сделк|транзакц)\w*"
+)
+
+# Очевидные типы: (тип, регулярка, уверенность).
+# Мошенничество — только вместе с действием над счётом: само слово
+# «мошенники» чаще стоит в вопросе («не мошенники ли?») или в жалобе.
+_TYPE_RULES = [
+    ("Мошеннические действия", re.compile(
+        _OPERATION + r"\s+(\S+\s+){0,5}?без\s+(моего\s+)?(ведома|согласия|разрешения)|"
+        r"без\s+(моего\s+)?(ведома|согласия|разрешения)\s+(\S+\s+){0,3}?" + _OPERATION + r"|"
+        r"(операци|сделк|перевод|покупк|списани|транзакц)\w*\s+(\S+\s+){0,3}?"
+        r"не\s+(я\s+)?соверша|не\s+(я\s+)?соверша\w*\s+(\S+\s+){0,2}?"
+        r"(операци|сделк|перевод|покупк|списани|транзакц)|"
+        r"(взломал|взломан)\w*\s+(\S+\s+){0,2}?(аккаунт|кабинет|приложени|уч[её]тн)|"
+        r"(аккаунт|кабинет|уч[её]тн\w* запис)\w*\s+(\S+\s+){0,2}?взлом|"
+        r"(кто-то|посторонн\w*|неизвестн\w*)\s+(\S+\s+){0,2}?"
+        r"(зашел|зашёл|вош[её]л|" + _OPERATION + r")|"
+        r"unauthori[sz]ed\s+(transaction|transfer|withdrawal|access|login|trade)|"
+        r"(account|app)\s+(was\s+)?hacked|hacked\s+my"
+    ), 0.91),
+    ("Смена данных", re.compile(
+        r"(смен|измен|обнов|поменя|change|update|өзгерт)\w*\s+(\w+\s+){0,3}?"
+        r"(номер|телефон|e-?mail|почт|адрес|паспорт|фамили|phone|address|нөмір|мекенжай)|"
+        # в казахском глагол идёт после дополнения
+        r"(нөмір|телефон|мекенжай|e-?mail|пошта)\w*\s+(\w+\s+){0,2}?(өзгерт|ауыстыр)"
+    ), 0.92),
+    ("Неработоспособность приложения", re.compile(
+        r"(приложени\w*|app)\s+(\w+\s+){0,3}?(не работает|не грузится|не открывается|"
+        r"вылетает|зависает|crash\w*|not working)|"
+        r"(не работает|не грузится|не открывается|вылетает|зависает)\s+(\w+\s+){0,2}?приложени"
+    ), 0.9),
+]
+
+# Тональность: явные признаки раздражения или благодарности
+_NEGATIVE_MARKERS = re.compile(
+    r"!!|безобрази|возмут|ужасн|отвратит|позор|требую|жалоб|обман|"
+    r"мошенническ|сколько можно|до сих пор|не имеете права|верните|"
+    r"разочаров|недопустим|terrible|awful|unacceptable|disgust",
+)
+# «Спасибо» в конце письма — вежливость, а не тональность
+_POSITIVE_MARKERS = re.compile(
+    r"(большое|огромное) спасибо|благодарю за (помощь|быстр|оператив)|"
+    r"очень доволь|отличн\w* (сервис|работ|приложени)|үлкен рахмет|"
+    r"thank you so much|great service",
+)
+
+_PRIORITY = {
+    "Мошеннические действия": 9,
+    "Неработоспособность приложения": 7,
+    "Претензия": 6,
+    "Жалоба": 5,
+    "Смена данных": 3,
+    "Консультация": 3,
+    "Спам": 1,
+}
+
+_RECOMMENDATION = {
+    "Мошеннические действия": "Срочно заблокировать доступ и связаться с клиентом",
+    "Неработоспособность приложения": "Уточнить устройство и версию приложения, передать в техподдержку",
+    "Смена данных": "Запросить подтверждающие документы и обновить данные клиента",
+    "Спам": "Не требует ответа",
+}
+
+
+def detect_language(text: str):
+    """Язык по доле символов. Возвращает (язык, уверенность)."""
+    lower = text.lower()
+    cyr = len(_CYRILLIC.findall(lower))
+    lat = len(_LATIN.findall(lower))
+    kz = sum(1 for ch in lower if ch in _KZ_CHARS)
+    letters = cyr + lat + kz
+
+    if letters < 3:
+        return None, 0.0
+
+    kz_words = sum(1 for w in _WORD.findall(lower) if w in _KZ_WORDS)
+
+    if kz or kz_words:
+        # одна «қ» может быть опечаткой, несколько — уже казахский текст
+        return "KZ", min(0.99, 0.7 + 0.1 * (kz + kz_words))
+
+    # короткий текст — мало статистики, уверенность ниже
+    length_factor = min(1.0, letters / 15)
+
+    for language, count in (("RU", cyr), ("ENG", lat)):
+        share = count / letters
+        # латинские названия (Apple, ETF) в русском тексте — норма
+        if share >= 0.7:
+            return language, round(min(0.99, 0.6 + 0.4 * share) * length_factor, 3)
+
+    return None, 0.0
+
+
+def spam_score(text: str) -> float:
+    lower = text.lower()
+    spam = len(_SPAM_MARKERS.findall(lower))
+    if not spam:
+        return 0.0
+    if _BROKER_MARKERS.search(lower):
+        return 0.3
+    return min(0.97, 0.75 + 0.1 * spam)
+
+
+def obvious_type(text: str):
+    lower = text.lower()
+    for ticket_type, pattern, confidence in _TYPE_RULES:
+        if pattern.search(lower):
+            return ticket_type, confidence
+    return None, 0.0
+
+
+def detect_tone(text: str) -> str:
+    lower = text.lower()
+    if _NEGATIVE_MARKERS.search(lower):
+        return "Негативный"
+    if _POSITIVE_MARKERS.search(lower):
+        return "Позитивный"
+    return "Нейтральный"
+
+
+def classify(desc: str) -> dict:
+    text = desc or ""
+    language, language_conf = detect_language(text)
+    ticket_type, type_conf = obvious_type(text)
+    return {
+        "language": language,
+        "language_confidence": language_conf,
+        "spam_confidence": spam_score(text),
+        "ticket_type": ticket_type,
+        "type_confidence": type_conf,
+    }
+
+
+def fast_path(desc: str, threshold: float = FASTPATH_THRESHOLD):
+    """Результат анализа без LLM или None, если правила не уверены."""
+    if not desc or not desc.strip():
+        return None
+
+    c = classify(desc)
+
+    if c["language_confidence"] < threshold:
+        return None
+
+    if c["spam_confidence"] >= threshold:
+        ticket_type = "Спам"
+    elif c["type_confidence"] >= threshold:
+        ticket_type = c["ticket_type"]
+    else:
+        return None
+
+    return {
+        "ticket_type":    ticket_type,
+        "tone":           "Нейтральный" if ticket_type == "Спам" else detect_tone(desc),
+        "priority":       _PRIORITY[ticket_type],
+        "language":       c["language"],
+        "summary":        desc.strip()[:150],
+        "recommendation": _RECOMMENDATION.get(ticket_type, ""),
+        "source":         "fastpath",
+    }
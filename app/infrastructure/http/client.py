@@ -0,0 +1,283 @@
+import asyncio
+import bisect
+import random
+import threading
+import time
+
+import httpx
+
+from app.core.config import (
+    HTTP_MAX_CONNECTIONS,
+    HTTP_MAX_KEEPALIVE,
+    HTTP_RETRIES,
+    HTTP_BACKOFF_BASE_SEC,
+    HTTP_BACKOFF_MAX_SEC,
+    HTTP_BREAKER_FAILURES,
+    HTTP_BREAKER_RESET_SEC,
+)
+
+# Ответы, после которых имеет смысл повторить запрос
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Границы корзин гистограммы задержек, мс
+LATENCY_BUCKETS_MS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000]
+
+
+class UpstreamError(RuntimeError):
+    pass
+
+
+class CircuitOpenError(UpstreamError):
+    pass
+
+
+class CircuitBreaker:
+    """closed -> open после N ошибок подряд -> half-open через reset_sec.
+
+    В half-open пропускается один пробный запрос: успех закрывает цепь,
+    ошибка снова открывает её на reset_sec.
+    """
+
+    def __init__(self, failures: int, reset_sec: float):
+        self._threshold = failures
+        self._reset_sec = reset_sec
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+        self._probe = None
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if time.monotonic() - self._opened_at >= self._reset_sec:
+                return "half-open"
+            return "open"
+
+    def allow(self, token=None) -> bool:
+        """token помечает пробный запрос, чтобы release() снял именно его."""
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at < self._reset_sec or self._probing:
+                return False
+            self._probing = True
+            self._probe = token
+            return True
+
+    def success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._probing or self._failures >= self._threshold:
+                self._opened_at = time.monotonic()
+            self._probing = False
+
+    def release(self, token):
+        """Снимает пробный запрос, не дождавшийся ни успеха, ни ошибки
+        (отмена, исключение не из транспорта) — следующий сможет пробовать."""
+        with self._lock:
+            if self._probing and self._probe is token:
+                self._probing = False
+
+
+class LatencyHistogram:
+    def __init__(self, buckets=LATENCY_BUCKETS_MS):
+        self._buckets = list(buckets)
+        self._counts = [0] * (len(self._buckets) + 1)
+        self._sum_ms = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, ms: float):
+        with self._lock:
+            self._counts[bisect.bisect_left(self._buckets, ms)] += 1
+            self._sum_ms += ms
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            count = sum(self._counts)
+            labels = [f"le_{b}" for b in self._buckets] + ["le_inf"]
+            return {
+                "count": count,
+                "avg_ms": round(self._sum_ms / count, 1) if count else None,
+                "buckets": dict(zip(labels, self._counts)),
+            }
+
+
+class Upstream:
+    def __init__(self, name: str, max_concurrency: int, timeout: float, retries: int):
+        self.name = name
+        self.timeout = timeout
+        self.retries = retries
+        self.breaker = CircuitBreaker(HTTP_BREAKER_FAILURES, HTTP_BREAKER_RESET_SEC)
+        self.latency = LatencyHistogram()
+
+        self.sync_slots = threading.BoundedSemaphore(max_concurrency)
+        self.async_slots = asyncio.Semaphore(max_concurrency)
+
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.failures = 0
+        self.retried = 0
+        self.rejected = 0
+
+    def count(self, counter: str):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def stats(self) -> dict:
+        with self._lock:
+            counters = {
+                "calls": self.calls,
+                "failures": self.failures,
+                "retries": self.retried,
+                "rejected": self.rejected,
+            }
+        return {
+            "state": self.breaker.state,
+            **counters,
+            "latency": self.latency.snapshot(),
+        }
+
+
+class HttpClient:
+    """Общий исходящий HTTP-клиент: пулы keep-alive соединений (sync и async),
+    лимит параллельных запросов на апстрим, повторы с jitter-backoff и
+    circuit breaker, чтобы медленный апстрим отказывал сразу.
+    """
+
+    def __init__(self):
+        self._limits = httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+        )
+        self._upstreams = {}
+        self._lock = threading.Lock()
+        self._sync = None
+        self._async = None
+
+    def register(self, name: str, max_concurrency: int = 10,
+                 timeout: float = 10.0, retries: int = HTTP_RETRIES):
+        self._upstreams[name] = Upstream(name, max_concurrency, timeout, retries)
+
+    def _client(self) -> httpx.Client:
+        if self._sync is None:
+            with self._lock:
+                if self._sync is None:
+                    self._sync = httpx.Client(limits=self._limits)
+        return self._sync
+
+    def _async_client(self) -> httpx.AsyncClient:
+        # создаётся в цикле событий приложения, при первом запросе
+        if self._async is None:
+            self._async = httpx.AsyncClient(limits=self._limits)
+        return self._async
+
+    @staticmethod
+    def _backoff(attempt: int) -> float:
+        return random.uniform(0, min(HTTP_BACKOFF_MAX_SEC, HTTP_BACKOFF_BASE_SEC * 2 ** attempt))
+
+    def _before(self, up: Upstream):
+        """Пропуск через breaker; возвращает токен попытки для release()."""
+        token = object()
+        if not up.breaker.allow(token):
+            up.count("rejected")
+            raise CircuitOpenError(f"{up.name}: circuit open")
+        up.count("calls")
+        return token
+
+    @staticmethod
+    def _after(up: Upstream, started: float, response, error) -> bool:
+        """Учитывает попытку; True — если её стоит повторить."""
+        up.latency.observe((time.perf_counter() - started) * 1000)
+        if error is None and response.status_code not in RETRY_STATUSES:
+            up.breaker.success()
+            return False
+        up.count("failures")
+        up.breaker.failure()
+        return True
+
+    def request(self, upstream: str, method: str, url: str, **kwargs) -> httpx.Response:
+        up = self._upstreams[upstream]
+        kwargs.setdefault("timeout", up.timeout)
+
+        for attempt in range(up.retries + 1):
+            token = self._before(up)
+            response, error = None, None
+            try:
+                with up.sync_slots:
+                    # ожидание слота — очередь в процессе, а не задержка апстрима
+                    started = time.perf_counter()
+                    response = self._client().request(method, url, **kwargs)
+            except httpx.TransportError as e:
+                error = e
+            finally:
+                # отмена или чужое исключение: попытка не учтена, но
+                # пробный запрос half-open нельзя оставлять занятым
+                if response is None and error is None:
+                    up.breaker.release(token)
+
+            if not self._after(up, started, response, error):
+                return response
+            if attempt < up.retries:
+                up.count("retried")
+                time.sleep(self._backoff(attempt))
+
+        raise UpstreamError(f"{up.name}: {error or response.status_code}")
+
+    async def arequest(self, upstream: str, method: str, url: str, **kwargs) -> httpx.Response:
+        up = self._upstreams[upstream]
+        kwargs.setdefault("timeout", up.timeout)
+
+        for attempt in range(up.retries + 1):
+            token = self._before(up)
+            response, error = None, None
+            try:
+                async with up.async_slots:
+                    # ожидание слота — очередь в процессе, а не задержка апстрима
+                    started = time.perf_counter()
+                    response = await self._async_client().request(method, url, **kwargs)
+            except httpx.TransportError as e:
+                error = e
+            finally:
+                # отмена или чужое исключение: попытка не учтена, но
+                # пробный запрос half-open нельзя оставлять занятым
+                if response is None and error is None:
+                    up.breaker.release(token)
+
+            if not self._after(up, started, response, error):
+                return response
+            if attempt < up.retries:
+                up.count("retried")
+                await asyncio.sleep(self._backoff(attempt))
+
+        raise UpstreamError(f"{up.name}: {error or response.status_code}")
+
+    def get(self, upstream: str, url: str, **kwargs) -> httpx.Response:
+        return self.request(upstream, "GET", url, **kwargs)
+
+    async def aget(self, upstream: str, url: str, **kwargs) -> httpx.Response:
+        return await self.arequest(upstream, "GET", url, **kwargs)
+
+    def stats(self) -> dict:
+        return {name: up.stats() for name, up in self._upstreams.items()}
+
+    def close(self):
+        if self._sync is not None:
+            self._sync.close()
+            self._sync = None
+
+    async def aclose(self):
+        if self._async is not None:
+            await self._async.aclose()
+            self._async = None
+
+
+http_client = HttpClient()
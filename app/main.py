@@ -3,12 +3,17 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.core.db import init_db, SessionLocal
-from app.db.seeders.seed_offices import seed_offices
-from app.db.seeders.seed_managers import seed_managers
+from app.core.db import SessionLocal, async_engine
+from app.db.seeders.run_seeds import startup
+from app.modules.tickets.jobs import recover_orphaned_jobs
 
 from app.modules.tickets.api import router as tickets_router
 from app.modules.geo.api import router as geo_router
+from app.modules.metrics.api import router as metrics_router
+from app.modules.events.api import router as events_router
+from app.modules.events.hub import event_hub
+from app.infrastructure.rabbit.publisher import publisher
+from app.infrastructure.http.client import http_client
 
 from fastapi.responses import FileResponse
 from fastapi.staticfiles import StaticFiles
@@ -18,18 +23,18 @@ import os
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # 🔥 STARTUP
-    init_db()
-
-    db = SessionLocal()
-    try:
-        seed_offices(db)
-        seed_managers(db)
-        db.commit()
-    finally:
-        db.close()
+    app.state.startup = startup()
+    with SessionLocal() as db:
+        recover_orphaned_jobs(db)
 
     yield  # приложение работает
 
+    event_hub.close()
+    publisher.close()
+    http_client.close()
+    await http_client.aclose()
+    await async_engine.dispose()
+
 
 app = FastAPI(
     title="F.I.R.E. Challenge API",
@@ -50,4 +55,6 @@ app.mount("/static", StaticFiles(directory="static"), name="static")
 def dashboard():
     return FileResponse("static/index.html")
 app.include_router(tickets_router)
-app.include_router(geo_router)
\ No newline at end of file
+app.include_router(geo_router)
+app.include_router(metrics_router)
+app.include_router(events_router)
\ No newline at end of file
@@ -0,0 +1,164 @@
+import threading
+import time
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core.config import ASSIGNMENT_INDEX_REFRESH_SEC
+
+SKILL_BITS = {"VIP": 1, "ENG": 2, "KZ": 4}
+
+# Ключ «все менеджеры» — запасной список, если в офисе никого нет
+ALL = "*"
+
+
+class IndexedManager:
+    __slots__ = ("id", "name", "office_id", "position", "skills", "skill_mask", "order")
+
+    def __init__(self, id, name, office_id, position, skills, order):
+        self.id = id
+        self.name = name
+        self.office_id = office_id
+        self.position = position
+        self.skills = skills or []
+        self.order = order
+
+        mask = 0
+        for skill in self.skills:
+            mask |= SKILL_BITS.get(skill, 0)
+        self.skill_mask = mask
+
+    def has_skill(self, skill: str) -> bool:
+        bit = SKILL_BITS.get(skill.strip())
+        if bit is None:
+            return skill.strip() in self.skills
+        return bool(self.skill_mask & bit)
+
+
+def candidate_key(office_id, ticket_type, segment, language):
+    """Сводит параметры тикета к тем признакам, от которых зависят фильтры."""
+    return (
+        office_id,
+        segment in ("VIP", "Priority"),
+        ticket_type == "Смена данных",
+        language if language in ("KZ", "ENG") else None,
+    )
+
+
+class AssignmentIndex:
+    """Менеджеры в памяти: готовые списки кандидатов.
+
+    Для каждого офиса заранее считаются списки кандидатов на все
+    комбинации (VIP-сегмент, смена данных, язык) теми же правилами,
+    что и service.filter_candidates. Состав менеджеров сверяется по
+    отпечатку таблицы не реже ASSIGNMENT_INDEX_REFRESH_SEC.
+
+    workload здесь не хранится: его меняют все реплики, поэтому
+    назначение читает его из БД в своей транзакции.
+    """
+
+    def __init__(self, refresh_sec: int = ASSIGNMENT_INDEX_REFRESH_SEC):
+        self._refresh_sec = refresh_sec
+        self._lock = threading.RLock()
+        self._fingerprint = None
+        self._checked_at = 0.0
+
+        self._offices = {}       # city -> office_id
+        self._managers = {}      # manager_id -> IndexedManager
+        self._lists = {}         # key -> [manager_id, ...] в порядке загрузки
+
+    def invalidate(self):
+        with self._lock:
+            self._fingerprint = None
+            self._checked_at = 0.0
+
+    # -----------------------------
+    # LOAD
+    # -----------------------------
+
+    def _ensure_fresh(self, db: Session):
+        with self._lock:
+            if self._fingerprint and time.monotonic() - self._checked_at < self._refresh_sec:
+                return
+
+            fingerprint = db.execute(text("""
+                SELECT md5(
+                    coalesce((SELECT string_agg(id::text || '|' || city, ',' ORDER BY id)
+                              FROM offices), '')
+                    || '#' ||
+                    coalesce((SELECT string_agg(
+                                 id::text || '|' || name || '|' || position || '|'
+                                 || office_id::text || '|'
+                                 || coalesce(array_to_string(skills, ','), ''),
+                                 ',' ORDER BY id)
+                              FROM managers), '')
+                )
+            """)).scalar()
+
+            if fingerprint != self._fingerprint:
+                self._load(db)
+                self._fingerprint = fingerprint
+
+            self._checked_at = time.monotonic()
+
+    def _load(self, db: Session):
+        from app.modules.assignment.service import filter_candidates
+
+        self._offices = {
+            city: office_id
+            for office_id, city in db.execute(text("SELECT id, city FROM offices")).all()
+        }
+
+        rows = db.execute(text("""
+            SELECT id, name, office_id, position, skills
+            FROM managers
+            ORDER BY id
+        """)).all()
+
+        self._managers = {
+            r.id: IndexedManager(r.id, r.name, r.office_id, r.position, r.skills, order)
+            for order, r in enumerate(rows)
+        }
+
+        by_office = {}
+        for m in self._managers.values():
+            by_office.setdefault(m.office_id, []).append(m)
+
+        lists = {(ALL,): [m.id for m in self._managers.values()]}
+
+        for office_id, managers in by_office.items():
+            for segment in (None, "VIP"):
+                for ticket_type in (None, "Смена данных"):
+                    for language in (None, "KZ", "ENG"):
+                        key = candidate_key(office_id, ticket_type, segment, language)
+                        lists[key] = [
+                            m.id for m in
+                            filter_candidates(managers, ticket_type, segment, language)
+                        ]
+
+        self._lists = lists
+
+    # -----------------------------
+    # QUERY
+    # -----------------------------
+
+    def office_id(self, db: Session, city: str):
+        self._ensure_fresh(db)
+        return self._offices.get(city)
+
+    def candidates(self, db: Session, office_id, ticket_type, segment, language) -> list:
+        """Список кандидатов в порядке id, с запасным «все менеджеры»."""
+        self._ensure_fresh(db)
+
+        with self._lock:
+            key = candidate_key(office_id, ticket_type, segment, language)
+            ids = self._lists.get(key) or self._lists.get((ALL,), [])
+            return [self._managers[mid] for mid in ids]
+
+    def get(self, manager_id):
+        """Менеджер из уже загруженного индекса, без похода в БД."""
+        with self._lock:
+            return self._managers.get(manager_id)
+
+
+assignment_index = AssignmentIndex()
@@ -1,4 +1,11 @@
-from app.modules.tickets.models import RoundRobinState, Manager, Office
+import heapq
+import uuid
+
+from sqlalchemy import update, func, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app.modules.tickets.models import RoundRobinState, Manager, Office, Ticket
+from app.modules.assignment.index import assignment_index
 
 
 _FOREIGN_OFFICES = ['Астана', 'Алматы']
@@ -12,16 +19,11 @@ def _next_foreign_office() -> str:
     return office
 
 
-def get_candidates(session, office_obj: Office,
-                   ticket_type: str,
-                   segment: str,
-                   language: str) -> list:
-
-    all_managers = (
-        session.query(Manager)
-        .filter(Manager.office_id == office_obj.id)
-        .all()
-    )
+def filter_candidates(all_managers: list,
+                      ticket_type: str,
+                      segment: str,
+                      language: str) -> list:
+    """Правила отбора кандидатов. Общие для запроса в БД и для AssignmentIndex."""
 
     candidates = all_managers[:]
 
@@ -50,51 +52,166 @@ def get_candidates(session, office_obj: Office,
     return candidates
 
 
-def round_robin_pick(session, office_obj: Office, candidates: list) -> Manager:
-
-    top2 = sorted(candidates, key=lambda m: m.workload)[:2]
+def _next_slot(session, office_id, n: int) -> int:
+    """Атомарно сдвигает слот round robin офиса и возвращает текущий.
 
-    rr = (
-        session.query(RoundRobinState)
-        .filter(RoundRobinState.office_id == office_obj.id)
-        .first()
+    Один upsert вместо read-modify-write: параллельные воркеры не теряют
+    сдвиги. RETURNING отдаёт новый слот, текущий — (new - 1) % n.
+    """
+    stmt = pg_insert(RoundRobinState).values(
+        id=uuid.uuid4(),
+        office_id=office_id,
+        slot=1 % n,
     )
-
-    if rr is None:
-        rr = RoundRobinState(office_id=office_obj.id, slot=0)
-        session.add(rr)
-
-    slot = rr.slot % len(top2)
-    chosen = top2[slot]
-    rr.slot = (rr.slot + 1) % len(top2)
-
-    return chosen
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[RoundRobinState.office_id],
+        set_={"slot": (RoundRobinState.slot + 1) % n},
+    ).returning(RoundRobinState.slot)
+
+    new_slot = session.execute(stmt).scalar_one()
+    return (new_slot - 1) % n
+
+
+def current_workloads(session, manager_ids, lock: bool = False) -> dict:
+    """{manager_id: workload} из БД — в транзакции вызывающего.
+
+    workload меняют все реплики консьюмера, поэтому его берут из базы
+    при каждом назначении, а индекс даёт только состав кандидатов.
+    lock=True блокирует строки до конца транзакции — всегда в порядке id,
+    чтобы параллельные волны не ждали друг друга по кругу.
+    """
+    sql = "SELECT id, coalesce(workload, 0) FROM managers WHERE id = ANY(:ids)"
+    if lock:
+        sql += " ORDER BY id FOR UPDATE"
+    rows = session.execute(text(sql), {"ids": sorted(manager_ids)}).all()
+    return dict(rows)
+
+
+def increment_workload(session, manager_id) -> int:
+    """UPDATE ... SET workload = workload + 1 RETURNING workload."""
+    stmt = (
+        update(Manager)
+        .where(Manager.id == manager_id)
+        .values(workload=func.coalesce(Manager.workload, 0) + 1)
+        .returning(Manager.workload)
+        .execution_options(synchronize_session=False)
+    )
+    return session.execute(stmt).scalar_one()
 
 
 def assign_ticket(session, ticket, forced_office: str):
 
-    office_obj = (
-        session.query(Office)
-        .filter(Office.city == forced_office)
-        .first()
-    )
+    office_id = assignment_index.office_id(session, forced_office)
 
-    if not office_obj:
+    if not office_id:
         raise Exception(f"Office not found: {forced_office}")
 
-    candidates = get_candidates(
+    candidates = assignment_index.candidates(
         session,
-        office_obj,
+        office_id,
         ticket.ticket_type,
         ticket.segment,
         ticket.language
     )
 
     if not candidates:
-        candidates = session.query(Manager).all()
-        candidates = sorted(candidates, key=lambda m: m.workload)
+        raise Exception("No managers available")
+
+    workloads = current_workloads(session, [m.id for m in candidates])
+    top2 = sorted(candidates, key=lambda m: (workloads.get(m.id, 0), m.order))[:2]
+
+    chosen = top2[_next_slot(session, office_id, len(top2))]
+    increment_workload(session, chosen.id)
 
-    chosen = round_robin_pick(session, office_obj, candidates)
-    chosen.workload += 1
+    return chosen, session.get(Office, office_id)
+
+
+def assign_tickets_batch(session, items: list) -> dict:
+    """Назначает волну тикетов за один проход.
+
+    items — [(ticket, office_city)], у тикетов уже заполнены тип, сегмент
+    и язык. Кандидаты для каждого тикета — те же, что у assign_ticket
+    (VIP / главный специалист / язык), но вместо «топ-2 + round robin»
+    каждый тикет уходит наименее загруженному кандидату с учётом
+    назначений внутри этой же волны (min-куча по workload). Тикеты с
+    большим приоритетом распределяются первыми.
+
+    Текущий workload кандидатов читается из БД, назначения и приращения
+    пишутся в текущую транзакцию; коммит — на вызывающем. Возвращает {ticket.id: (manager, office_id)}.
+    """
+    ordered = sorted(items, key=lambda it: -(it[0].priority or 0))
+
+    wave = []
+    for ticket, city in ordered:
+        office_id = assignment_index.office_id(session, city)
+        if not office_id:
+            raise Exception(f"Office not found: {city}")
+
+        candidates = assignment_index.candidates(
+            session, office_id, ticket.ticket_type, ticket.segment, ticket.language
+        )
+        if not candidates:
+            raise Exception("No managers available")
+
+        wave.append((ticket, office_id, candidates))
+
+    # строки кандидатов блокируются заранее и по порядку id: UPDATE ниже
+    # брал бы их в произвольном порядке, и две волны могли бы
+    # заблокировать друг друга
+    workloads = current_workloads(
+        session, {m.id for _, _, candidates in wave for m in candidates}, lock=True
+    )
+    heaps = {}
+    plan = []
+
+    for ticket, office_id, candidates in wave:
+        key = tuple(m.id for m in candidates)
+        heap = heaps.get(key)
+        if heap is None:
+            for m in candidates:
+                workloads.setdefault(m.id, 0)
+            heap = [(workloads[m.id], m.order, m.id, m) for m in candidates]
+            heapq.heapify(heap)
+            heaps[key] = heap
+
+        # ленивая куча: пропускаем записи, устаревшие из-за других списков
+        while heap[0][0] != workloads[heap[0][2]]:
+            _, order, mid, m = heapq.heappop(heap)
+            heapq.heappush(heap, (workloads[mid], order, mid, m))
+
+        _, order, mid, chosen = heapq.heappop(heap)
+        workloads[mid] += 1
+        heapq.heappush(heap, (workloads[mid], order, mid, chosen))
+
+        plan.append((ticket, chosen, office_id))
+
+    if not plan:
+        return {}
+
+    deltas = {}
+    for _, chosen, _ in plan:
+        deltas[chosen.id] = deltas.get(chosen.id, 0) + 1
+
+    session.execute(
+        text("""
+            UPDATE managers AS m
+            SET workload = coalesce(m.workload, 0) + d.delta
+            FROM unnest(CAST(:ids AS uuid[]), CAST(:deltas AS int[])) AS d(id, delta)
+            WHERE m.id = d.id
+        """),
+        {"ids": sorted(deltas), "deltas": [deltas[mid] for mid in sorted(deltas)]},
+    )
+
+    session.execute(
+        update(Ticket).execution_options(synchronize_session=False),
+        [
+            {
+                "id": ticket.id,
+                "assigned_manager_id": chosen.id,
+                "assigned_office_id": office_id,
+            }
+            for ticket, chosen, office_id in plan
+        ],
+    )
 
-    return chosen, office_obj
\ No newline at end of file
+    return {ticket.id: (chosen, office_id) for ticket, chosen, office_id in plan}
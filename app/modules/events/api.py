@@ -0,0 +1,19 @@
+from fastapi import APIRouter, Request
+from fastapi.responses import StreamingResponse
+
+from app.modules.events.hub import event_hub
+
+router = APIRouter(prefix="/api", tags=["events"])
+
+
+@router.get("/events")
+async def events(request: Request):
+    """SSE-поток: ticket (тикет обработан), ingest (загружена пачка), resync."""
+    return StreamingResponse(
+        event_hub.stream(request),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+        },
+    )
@@ -0,0 +1,165 @@
+import asyncio
+import json
+import threading
+import time
+
+import psycopg
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+
+from app.core.db import DATABASE_URL
+from app.core.log import log
+
+CHANNEL = "ticket_events"
+
+# NOTIFY ограничен ~8000 байт; событие больше этого шлём без тела
+MAX_PAYLOAD = 7900
+
+SUBSCRIBER_QUEUE_SIZE = 1000
+HEARTBEAT_SEC = 15
+RECONNECT_DELAY_SEC = 2
+
+
+def notify(db, kind: str, data: dict) -> None:
+    """Ставит событие в текущую транзакцию.
+
+    Postgres доставит его слушателям только после коммита и выбросит при
+    откате — клиенты не увидят изменений, которых нет в базе.
+    """
+    payload = json.dumps({"kind": kind, **data}, ensure_ascii=False, default=str)
+    if len(payload.encode()) > MAX_PAYLOAD:
+        payload = json.dumps({"kind": "resync"})
+    db.execute(text("SELECT pg_notify(:channel, :payload)"),
+               {"channel": CHANNEL, "payload": payload})
+
+
+class _Subscriber:
+    __slots__ = ("loop", "queue", "lagged")
+
+    def __init__(self, loop):
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self.lagged = False
+
+    def push(self, message: bytes):
+        # вызывается в потоке цикла событий клиента
+        if self.lagged:
+            return
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            self.lagged = True
+
+
+class EventHub:
+    """Один LISTEN на процесс, рассылка всем SSE-клиентам.
+
+    Фоновый поток держит отдельное соединение psycopg и ждёт NOTIFY.
+    Каждое событие один раз превращается в SSE-кадр и раскладывается по
+    очередям подписчиков — клиенты не ходят в базу сами. Клиент, который
+    не успевает читать, получает resync и перезагружает данные целиком.
+    """
+
+    def __init__(self, dsn: str):
+        self._dsn = dsn
+        self._lock = threading.Lock()
+        self._subscribers = set()
+        self._thread = None
+        self._stop = threading.Event()
+
+        self._received = 0
+        self._reconnects = 0
+
+    def _ensure_listener(self):
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._listen, name="event-hub", daemon=True
+            )
+            self._thread.start()
+
+    def _listen(self):
+        while not self._stop.is_set():
+            try:
+                with psycopg.connect(self._dsn, autocommit=True) as conn:
+                    conn.execute(f"LISTEN {CHANNEL}")
+                    # пока соединение было разорвано, события могли потеряться
+                    if self._reconnects:
+                        self._broadcast("resync", json.dumps({"kind": "resync"}))
+
+                    while not self._stop.is_set():
+                        for n in conn.notifies(timeout=1.0):
+                            self._received += 1
+                            kind = json.loads(n.payload).get("kind", "message")
+                            self._broadcast(kind, n.payload)
+            except Exception as e:
+                log(f"Event hub listener error: {e}")
+                self._reconnects += 1
+                self._stop.wait(RECONNECT_DELAY_SEC)
+
+    def _broadcast(self, kind: str, payload: str):
+        message = f"event: {kind}\ndata: {payload}\n\n".encode()
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for sub in subscribers:
+            try:
+                sub.loop.call_soon_threadsafe(sub.push, message)
+            except RuntimeError:
+                # цикл событий уже закрыт
+                self._unsubscribe(sub)
+
+    def _subscribe(self) -> _Subscriber:
+        sub = _Subscriber(asyncio.get_running_loop())
+        with self._lock:
+            self._subscribers.add(sub)
+        self._ensure_listener()
+        return sub
+
+    def _unsubscribe(self, sub: _Subscriber):
+        with self._lock:
+            self._subscribers.discard(sub)
+
+    async def stream(self, request):
+        """Асинхронный генератор SSE-кадров для одного клиента."""
+        sub = self._subscribe()
+        try:
+            yield b"retry: 3000\n\n"
+            while not await request.is_disconnected():
+                if sub.lagged:
+                    while not sub.queue.empty():
+                        sub.queue.get_nowait()
+                    sub.lagged = False
+                    yield b'event: resync\ndata: {"kind": "resync"}\n\n'
+                    continue
+
+                try:
+                    yield await asyncio.wait_for(sub.queue.get(), HEARTBEAT_SEC)
+                except asyncio.TimeoutError:
+                    # комментарий держит соединение через прокси
+                    yield b": ping\n\n"
+        finally:
+            self._unsubscribe(sub)
+
+    def close(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def stats(self) -> dict:
+        with self._lock:
+            clients = len(self._subscribers)
+        return {
+            "clients": clients,
+            "listening": self._thread is not None and self._thread.is_alive(),
+            "received": self._received,
+            "reconnects": self._reconnects,
+        }
+
+
+def _libpq_dsn(url: str) -> str:
+    return make_url(url).set(drivername="postgresql").render_as_string(hide_password=False)
+
+
+event_hub = EventHub(_libpq_dsn(DATABASE_URL))
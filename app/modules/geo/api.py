@@ -1,14 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from app.core.db import get_db
+from fastapi import APIRouter, HTTPException
+from app.infrastructure.http.client import UpstreamError
 from app.modules.geo import service
 from app.modules.geo.schemas import AddressRequest, OfficeResponse
 
 router = APIRouter()
 
 @router.post("/nearest-office", response_model=OfficeResponse)
-def nearest_office(data: AddressRequest, db: Session = Depends(get_db)):
-    office = service.get_nearest_office(db, data.address)
+async def nearest_office(data: AddressRequest):
+    try:
+        office = await service.get_nearest_office_async(data.address)
+    except UpstreamError as e:
+        raise HTTPException(503, f"Geocoder unavailable: {e}")
 
     if not office:
         raise HTTPException(404, "No office found")
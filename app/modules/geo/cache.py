@@ -0,0 +1,125 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app.core.config import (
+    GEOCODE_TTL_DAYS,
+    GEOCODE_NEGATIVE_TTL_HOURS,
+    GEOCODE_MEMORY_SIZE,
+)
+from app.core.db import SessionLocal
+from app.modules.tickets.models import GeocodeCache
+
+_PUNCT = re.compile(r"[^\w\s/-]")
+_WS = re.compile(r"\s+")
+
+
+def normalize_address(address: str) -> str:
+    value = (address or "").lower().replace("ё", "е")
+    value = _PUNCT.sub(" ", value)
+    return _WS.sub(" ", value).strip()[:500]
+
+
+class GeocodeCacheStore:
+    """Кэш координат по нормализованному адресу: память процесса + таблица geocode_cache.
+
+    Адреса, которые 2GIS не нашёл, тоже кэшируются (с более коротким TTL),
+    чтобы не тратить на них квоту повторно. Ошибки сети не кэшируются.
+    """
+
+    def __init__(self, max_size: int = GEOCODE_MEMORY_SIZE):
+        self._max_size = max_size
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()   # key -> (coords | None, expires_ts)
+
+        self._memory_hits = 0
+        self._db_hits = 0
+        self._negative_hits = 0
+        self._misses = 0
+
+    def _remember(self, key, coords, expires_ts):
+        self._memory[key] = (coords, expires_ts)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self._max_size:
+            self._memory.popitem(last=False)
+
+    def get(self, key: str):
+        """Возвращает (найдено_в_кэше, координаты_или_None)."""
+        now = time.time()
+
+        with self._lock:
+            cached = self._memory.get(key)
+            if cached is not None and cached[1] > now:
+                self._memory.move_to_end(key)
+                self._memory_hits += 1
+                if cached[0] is None:
+                    self._negative_hits += 1
+                return True, cached[0]
+
+        with SessionLocal() as db:
+            row = db.execute(
+                select(GeocodeCache.lat, GeocodeCache.lon, GeocodeCache.expires_at)
+                .where(GeocodeCache.address == key,
+                       GeocodeCache.expires_at > datetime.utcnow())
+            ).first()
+
+        with self._lock:
+            if row is None:
+                self._misses += 1
+                return False, None
+
+            coords = (row.lat, row.lon) if row.lat is not None else None
+            expires_ts = now + (row.expires_at - datetime.utcnow()).total_seconds()
+            self._remember(key, coords, expires_ts)
+            self._db_hits += 1
+            if coords is None:
+                self._negative_hits += 1
+            return True, coords
+
+    def put(self, key: str, coords):
+        ttl = (
+            timedelta(days=GEOCODE_TTL_DAYS) if coords
+            else timedelta(hours=GEOCODE_NEGATIVE_TTL_HOURS)
+        )
+        now = datetime.utcnow()
+        lat, lon = coords if coords else (None, None)
+
+        with self._lock:
+            self._remember(key, coords, time.time() + ttl.total_seconds())
+
+        stmt = pg_insert(GeocodeCache).values(
+            address=key, lat=lat, lon=lon, created_at=now, expires_at=now + ttl,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[GeocodeCache.address],
+            set_={
+                "lat": stmt.excluded.lat,
+                "lon": stmt.excluded.lon,
+                "created_at": stmt.excluded.created_at,
+                "expires_at": stmt.excluded.expires_at,
+            },
+        )
+        with SessionLocal() as db:
+            db.execute(stmt)
+            db.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            hits = self._memory_hits + self._db_hits
+            lookups = hits + self._misses
+            return {
+                "memory_entries": len(self._memory),
+                "memory_hits": self._memory_hits,
+                "db_hits": self._db_hits,
+                "negative_hits": self._negative_hits,
+                "misses": self._misses,
+                "hit_ratio": round(hits / lookups, 3) if lookups else None,
+            }
+
+
+geocode_cache = GeocodeCacheStore()
@@ -0,0 +1,92 @@
+import math
+import threading
+import time
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core.config import OFFICE_INDEX_REFRESH_SEC
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def _unit_vector(lat: float, lon: float):
+    la, lo = math.radians(lat), math.radians(lon)
+    return (
+        math.cos(la) * math.cos(lo),
+        math.cos(la) * math.sin(lo),
+        math.sin(la),
+    )
+
+
+class OfficeIndex:
+    """Координаты офисов в памяти процесса для поиска ближайшего без SQL.
+
+    Офисы хранятся как единичные векторы на сфере: ближайший — тот, у кого
+    больше скалярное произведение, тригонометрия считается один раз на
+    запрос, а не на каждый офис. Индекс перечитывается, когда меняется
+    отпечаток таблицы offices (проверка не чаще OFFICE_INDEX_REFRESH_SEC)
+    или после invalidate(). У пустой таблицы отпечатка нет, поэтому пустой
+    индекс перечитывается при каждом вызове.
+    """
+
+    def __init__(self, refresh_sec: int = OFFICE_INDEX_REFRESH_SEC):
+        self._refresh_sec = refresh_sec
+        self._lock = threading.Lock()
+        self._offices = []          # [(city, address, (x, y, z))]
+        self._fingerprint = None
+        self._checked_at = 0.0
+
+    def invalidate(self):
+        with self._lock:
+            self._fingerprint = None
+            self._checked_at = 0.0
+
+    def _ensure_fresh(self, db: Session):
+        if time.monotonic() - self._checked_at < self._refresh_sec and self._fingerprint:
+            return
+
+        with self._lock:
+            if time.monotonic() - self._checked_at < self._refresh_sec and self._fingerprint:
+                return
+
+            fingerprint = db.execute(text("""
+                SELECT md5(string_agg(
+                         city || '|' || address || '|' || ST_AsText(location),
+                         ',' ORDER BY city))
+                FROM offices
+            """)).scalar()
+
+            if fingerprint != self._fingerprint:
+                rows = db.execute(text("""
+                    SELECT city, address,
+                           ST_Y(location::geometry) AS lat,
+                           ST_X(location::geometry) AS lon
+                    FROM offices
+                    ORDER BY city
+                """)).all()
+                self._offices = [
+                    (r.city, r.address, _unit_vector(r.lat, r.lon)) for r in rows
+                ]
+                self._fingerprint = fingerprint
+
+            self._checked_at = time.monotonic()
+
+    def nearest(self, db: Session, lat: float, lon: float):
+        """(city, address, distance_km) ближайшего офиса или None."""
+        self._ensure_fresh(db)
+
+        offices = self._offices
+        if not offices:
+            return None
+
+        px, py, pz = _unit_vector(lat, lon)
+        best = max(offices, key=lambda o: px * o[2][0] + py * o[2][1] + pz * o[2][2])
+
+        dot = px * best[2][0] + py * best[2][1] + pz * best[2][2]
+        distance_km = EARTH_RADIUS_KM * math.acos(max(-1.0, min(1.0, dot)))
+
+        return best[0], best[1], distance_km
+
+
+office_index = OfficeIndex()
@@ -1,14 +1,68 @@
 from sqlalchemy import text
 
+# Сколько ближайших по индексу (<->) офисов перепроверять точным ST_Distance.
+# <-> по geography считает по сфере, ST_Distance — по сфероиду, на границе
+# порядок может отличаться, поэтому берём несколько кандидатов.
+KNN_CANDIDATES = 3
+
+
 def find_nearest_office(db, lat: float, lon: float):
     sql = text("""
         SELECT city, address,
                ST_Distance(
-                 location::geography,
+                 location,
                  ST_SetSRID(ST_MakePoint(:lon, :lat), 4326)::geography
                ) / 1000 AS distance_km
-        FROM offices
+        FROM (
+            SELECT city, address, location
+            FROM offices
+            ORDER BY location <-> ST_SetSRID(ST_MakePoint(:lon, :lat), 4326)::geography
+            LIMIT :k
+        ) AS knn
         ORDER BY distance_km ASC
         LIMIT 1;
     """)
-    return db.execute(sql, {"lat": lat, "lon": lon}).fetchone()
\ No newline at end of file
+    return db.execute(sql, {"lat": lat, "lon": lon, "k": KNN_CANDIDATES}).fetchone()
+
+
+def find_nearest_offices(db, points: list):
+    """Ближайший офис для каждой точки [(lat, lon), ...] за один запрос.
+
+    Возвращает список той же длины: строка (city, address, distance_km)
+    или None, если офисов нет.
+    """
+    if not points:
+        return []
+
+    sql = text("""
+        SELECT p.idx, n.city, n.address, n.distance_km
+        FROM unnest(CAST(:lats AS float8[]), CAST(:lons AS float8[]))
+             WITH ORDINALITY AS p(lat, lon, idx)
+        CROSS JOIN LATERAL (
+            SELECT city, address,
+                   ST_Distance(
+                     location,
+                     ST_SetSRID(ST_MakePoint(p.lon, p.lat), 4326)::geography
+                   ) / 1000 AS distance_km
+            FROM (
+                SELECT city, address, location
+                FROM offices
+                ORDER BY location <-> ST_SetSRID(ST_MakePoint(p.lon, p.lat), 4326)::geography
+                LIMIT :k
+            ) AS knn
+            ORDER BY distance_km ASC
+            LIMIT 1
+        ) AS n
+        ORDER BY p.idx;
+    """)
+
+    rows = db.execute(sql, {
+        "lats": [float(lat) for lat, _ in points],
+        "lons": [float(lon) for _, lon in points],
+        "k": KNN_CANDIDATES,
+    }).all()
+
+    result = [None] * len(points)
+    for row in rows:
+        result[row.idx - 1] = (row.city, row.address, row.distance_km)
+    return result
@@ -1,23 +1,45 @@
-import requests
+import asyncio
+
 from sqlalchemy.orm import Session
-from app.core.config import DGIS_KEY
+from app.core.config import DGIS_KEY, DGIS_MAX_CONCURRENCY, DGIS_TIMEOUT_SEC
+from app.core.db import SessionLocal
+from app.infrastructure.http.client import http_client
 from app.modules.geo import repository
+from app.modules.geo.cache import geocode_cache, normalize_address
+from app.modules.geo.office_index import office_index
 
 DGIS_URL = "https://catalog.api.2gis.com/3.0/items/geocode"
 
+http_client.register("2gis", max_concurrency=DGIS_MAX_CONCURRENCY, timeout=DGIS_TIMEOUT_SEC)
+
+
+def _geocode_params(address: str) -> dict:
+    return {
+        "q": address,
+        "fields": "items.point",
+        "key": DGIS_KEY
+    }
+
 
 def geocode_address(address: str):
-    r = requests.get(
-        DGIS_URL,
-        params={
-            "q": address,
-            "fields": "items.point",
-            "key": DGIS_KEY
-        },
-        timeout=10
-    )
+    r = http_client.get("2gis", DGIS_URL, params=_geocode_params(address))
+    return _parse_geocode(r)
 
+
+async def geocode_address_async(address: str):
+    r = await http_client.aget("2gis", DGIS_URL, params=_geocode_params(address))
+    return _parse_geocode(r)
+
+
+def _parse_geocode(r):
     data = r.json()
+
+    # 404 у 2GIS — «адрес не найден», всё остальное — ошибка запроса/квоты,
+    # её нельзя принимать за пустой ответ (иначе уйдёт в негативный кэш)
+    meta = data.get("meta") or {}
+    if meta.get("code", r.status_code) not in (200, 404):
+        raise RuntimeError(f"2GIS geocode error: {meta}")
+
     result = data.get("result")
 
     if not result or result.get("total", 0) == 0:
@@ -34,10 +56,62 @@ def geocode_address(address: str):
     return float(point["lat"]), float(point["lon"])
 
 
-def get_nearest_office(db: Session, address: str):
+def geocode_address_cached(address: str):
+    key = normalize_address(address)
+    if not key:
+        return None
+
+    found, coords = geocode_cache.get(key)
+    if found:
+        return coords
+
     coords = geocode_address(address)
+    geocode_cache.put(key, coords)
+    return coords
+
+
+async def geocode_address_cached_async(address: str):
+    key = normalize_address(address)
+    if not key:
+        return None
+
+    # кэш ходит в БД синхронно — в пул потоков, HTTP остаётся в цикле событий
+    found, coords = await asyncio.to_thread(geocode_cache.get, key)
+    if found:
+        return coords
+
+    coords = await geocode_address_async(address)
+    await asyncio.to_thread(geocode_cache.put, key, coords)
+    return coords
+
+
+def _nearest_from_index(lat: float, lon: float):
+    with SessionLocal() as db:
+        return office_index.nearest(db, lat, lon)
+
+
+async def get_nearest_office_async(address: str):
+    coords = await geocode_address_cached_async(address)
     if not coords:
         return None
 
     lat, lon = coords
-    return repository.find_nearest_office(db, lat, lon)
\ No newline at end of file
+    return await asyncio.to_thread(_nearest_from_index, lat, lon)
+
+
+def get_nearest_office(db: Session, address: str):
+    coords = geocode_address_cached(address)
+    if not coords:
+        return None
+
+    lat, lon = coords
+    return office_index.nearest(db, lat, lon)
+
+
+def get_nearest_offices(db: Session, addresses: list):
+    """Пакетный вариант для бэкфиллов: геокодирует адреса (через кэш)
+    и находит ближайшие офисы одним запросом к PostGIS."""
+    coords = [geocode_address_cached(a) for a in addresses]
+    known = [c for c in coords if c]
+    offices = iter(repository.find_nearest_offices(db, known))
+    return [next(offices) if c else None for c in coords]
@@ -0,0 +1,64 @@
+from fastapi import APIRouter, Depends, Request
+from sqlalchemy.orm import Session
+
+from app.core.db import get_db
+from app.infrastructure.http.client import http_client
+from app.infrastructure.rabbit.publisher import publisher
+from app.modules.events.hub import event_hub
+from app.modules.geo.cache import geocode_cache
+from app.modules.tickets import stats as ticket_stats
+from app.modules.metrics import repository
+from app.modules.metrics.reporter import process_name
+
+router = APIRouter(prefix="/api/metrics", tags=["metrics"])
+
+
+@router.get("/publisher")
+def publisher_metrics():
+    return publisher.stats()
+
+
+@router.get("/llm-cache")
+def llm_cache_metrics(db: Session = Depends(get_db)):
+    return repository.analysis_cache_stats(db)
+
+
+@router.get("/analysis-sources")
+def analysis_source_metrics(db: Session = Depends(get_db)):
+    return repository.analysis_source_stats(db)
+
+
+@router.get("/geocode-cache")
+def geocode_cache_metrics(db: Session = Depends(get_db)):
+    """Счётчики кэша геокодирования по процессам: консьюмеры присылают
+    снимки через process_metrics, этот процесс отвечает сам."""
+    processes = repository.process_metrics(db, "geocode_cache")
+    processes[process_name()] = geocode_cache.stats()
+    return {"processes": processes}
+
+
+@router.get("/startup")
+def startup_metrics(request: Request):
+    """Время холодного старта этого процесса: схема/миграции и сиды."""
+    return getattr(request.app.state, "startup", None)
+
+
+@router.get("/http")
+def http_metrics(db: Session = Depends(get_db)):
+    """Апстримы по процессам: 2GIS и LLM вызывает консьюмер, его снимки —
+    из process_metrics, этот процесс отвечает сам."""
+    processes = repository.process_metrics(db, "http")
+    processes[process_name()] = http_client.stats()
+    return {"processes": processes}
+
+
+@router.get("/events")
+def event_metrics():
+    return event_hub.stats()
+
+
+@router.get("/stats-consistency")
+def stats_consistency(db: Session = Depends(get_db)):
+    """Полный пересчёт по tickets против роллапов — дорогой, только для диагностики."""
+    mismatches = ticket_stats.check(db)
+    return {"ok": not mismatches, "mismatches": mismatches}
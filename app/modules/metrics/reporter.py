@@ -0,0 +1,74 @@
+import os
+import socket
+import threading
+from datetime import datetime
+
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app.core.config import METRICS_REPORT_SEC
+from app.core.db import SessionLocal
+from app.core.log import log
+from app.modules.tickets.models import ProcessMetric
+
+
+def process_name() -> str:
+    # не на уровне модуля: воркеры могут форкаться после импорта
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class MetricsReporter:
+    """Периодически пишет снимки счётчиков процесса в process_metrics.
+
+    Счётчики кэшей и HTTP-клиента живут в памяти процесса, а геокодирование
+    и вызовы LLM идут в консьюмере — API читает их снимки из базы.
+    """
+
+    def __init__(self, interval_sec: int = METRICS_REPORT_SEC):
+        self._interval_sec = interval_sec
+        self._sources = {}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def register(self, name: str, snapshot):
+        """snapshot() -> dict, JSON-сериализуемый."""
+        self._sources[name] = snapshot
+
+    def start(self):
+        self._thread = threading.Thread(target=self._loop, name="metrics-reporter", daemon=True)
+        self._thread.start()
+
+    def _loop(self):
+        while not self._stop.wait(self._interval_sec):
+            try:
+                self.flush()
+            except Exception as e:
+                log(f"Metrics report failed: {e}")
+
+    def flush(self):
+        if not self._sources:
+            return
+
+        now = datetime.utcnow()
+        process = process_name()
+        rows = [
+            {"process": process, "name": name, "data": snapshot(), "updated_at": now}
+            for name, snapshot in sorted(self._sources.items())
+        ]
+
+        stmt = pg_insert(ProcessMetric).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[ProcessMetric.process, ProcessMetric.name],
+            set_={"data": stmt.excluded.data, "updated_at": stmt.excluded.updated_at},
+        )
+        with SessionLocal() as db:
+            db.execute(stmt)
+            db.commit()
+
+    def close(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self.flush()
+
+
+metrics_reporter = MetricsReporter()
@@ -0,0 +1,65 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, func
+from sqlalchemy.orm import Session
+
+from app.core.config import METRICS_STALE_SEC
+from app.modules.tickets.models import AnalysisCache, ProcessMetric, Ticket
+
+
+def analysis_cache_stats(db: Session):
+    """Статистика кэша анализа по всем репликам консьюмера.
+
+    Каждая запись — это один промах (один реальный вызов LLM),
+    hits — сколько раз её результат переиспользовали.
+    """
+    stmt = (
+        select(
+            AnalysisCache.version,
+            func.count(),
+            func.coalesce(func.sum(AnalysisCache.hits), 0),
+            func.coalesce(func.sum(AnalysisCache.hits * AnalysisCache.tokens), 0),
+        )
+        .group_by(AnalysisCache.version)
+    )
+
+    versions = []
+    for version, entries, hits, tokens_saved in db.execute(stmt).all():
+        versions.append({
+            "version": version,
+            "entries": entries,
+            "hits": hits,
+            "hit_ratio": round(hits / (hits + entries), 3) if entries else None,
+            "tokens_saved": tokens_saved,
+        })
+
+    return {"versions": versions}
+
+
+def analysis_source_stats(db: Session):
+    """Сколько тикетов прошло через быстрый путь, кэш, LLM и fallback."""
+    stmt = (
+        select(Ticket.analysis_source, func.count())
+        .where(Ticket.analysis_source.is_not(None))
+        .group_by(Ticket.analysis_source)
+    )
+    by_source = {source: count for source, count in db.execute(stmt).all()}
+    total = sum(by_source.values())
+
+    return {
+        "total": total,
+        "by_source": by_source,
+        "fastpath_share": round(by_source.get("fastpath", 0) / total, 3) if total else None,
+        "llm_calls_avoided": by_source.get("fastpath", 0) + by_source.get("cache", 0),
+    }
+
+
+def process_metrics(db: Session, name: str, max_age_sec: int = METRICS_STALE_SEC):
+    """Свежие снимки счётчиков name от всех процессов: {process: data}."""
+    stmt = (
+        select(ProcessMetric.process, ProcessMetric.data)
+        .where(ProcessMetric.name == name,
+               ProcessMetric.updated_at > datetime.utcnow() - timedelta(seconds=max_age_sec))
+        .order_by(ProcessMetric.process)
+    )
+    return {process: data for process, data in db.execute(stmt).all()}
@@ -1,50 +1,77 @@
+import uuid
+from typing import Literal
+
 from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.core.db import get_db
-from app.modules.tickets import service
+from app.core.db import get_db, get_async_db
+from app.modules.tickets import jobs, repository, service
 
 router = APIRouter(prefix="/api", tags=["tickets"])
 
 
-@router.post("/upload-csv")
-async def upload_csv(file: UploadFile = File(...), db: Session = Depends(get_db)):
-    contents = await file.read()
-    created = service.process_csv(contents, db)
-    return {"status": "ok", "created": created}
+@router.post("/upload-csv", status_code=202)
+async def upload_csv(
+    file: UploadFile = File(...),
+    batch_size: int | None = Query(None, ge=1, le=10000),
+    clean: bool = Query(False),
+    db: Session = Depends(get_db),
+):
+    path = await run_in_threadpool(jobs.save_upload, file.file)
+    job = await run_in_threadpool(
+        jobs.submit_ingest_job, db, path, file.filename, batch_size, clean
+    )
+    return {"status": "accepted", "job_id": str(job.id)}
+
+
+@router.get("/ingest-jobs/{job_id}")
+async def ingest_job_status(job_id: uuid.UUID, db: AsyncSession = Depends(get_async_db)):
+    job = await repository.get_ingest_job(db, job_id)
+    if not job:
+        raise HTTPException(404, "Job not found")
+    return jobs.job_to_dict(job)
 
 
 @router.get("/tickets")
-def list_tickets(
+async def list_tickets(
     office: str | None = Query(None),
     type: str | None = Query(None),
     language: str | None = Query(None),
     priority_min: int = Query(1, ge=1, le=10),
     priority_max: int = Query(10, ge=1, le=10),
-    limit: int = Query(100, le=500),
-    offset: int = Query(0),
-    db: Session = Depends(get_db),
+    limit: int = Query(100, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+    cursor: str | None = Query(None),
+    total: Literal["exact", "cached", "estimate", "none"] = Query("cached"),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    return service.list_tickets_service(
-        db,
-        office=office,
-        type=type,
-        language=language,
-        priority_min=priority_min,
-        priority_max=priority_max,
-        limit=limit,
-        offset=offset,
-    )
+    try:
+        return await service.list_tickets_service(
+            db,
+            office=office,
+            type=type,
+            language=language,
+            priority_min=priority_min,
+            priority_max=priority_max,
+            limit=limit,
+            offset=offset,
+            cursor=cursor,
+            total=total,
+        )
+    except ValueError as e:
+        raise HTTPException(400, str(e))
 
 
 @router.get("/tickets/{ticket_id}")
-def ticket_detail(ticket_id: str, db: Session = Depends(get_db)):
-    data = service.ticket_detail_service(db, ticket_id)
+async def ticket_detail(ticket_id: str, db: AsyncSession = Depends(get_async_db)):
+    data = await service.ticket_detail_service(db, ticket_id)
     if not data:
         raise HTTPException(404, "Ticket not found")
     return data
 
 
 @router.get("/stats")
-def stats(db: Session = Depends(get_db)):
-    return service.stats_service(db)
\ No newline at end of file
+async def stats(db: AsyncSession = Depends(get_async_db)):
+    return await service.stats_service(db)
\ No newline at end of file
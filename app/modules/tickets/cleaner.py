@@ -0,0 +1,187 @@
+"""Очистка выгрузок CRM (CSV / XLSX) перед загрузкой.
+
+    python -m app.modules.tickets.cleaner tickets.csv -o clean.csv --workers 4
+
+Файл читается и пишется кусками по chunksize строк, так что память не
+зависит от размера выгрузки. Текстовые колонки чистятся целиком
+векторными строковыми операциями pandas; с workers > 1 куски
+обрабатываются в пуле процессов, порядок строк сохраняется.
+"""
+import argparse
+import csv
+import os
+import re
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+DEFAULT_CHUNKSIZE = 50_000
+
+BIRTH_DATE_COLUMN = "Дата рождения"
+
+# Переносы строк ломают CSV, повторные пробелы — мусор из CRM
+_WS = re.compile(r"\s+")
+
+
+def clean_text(value) -> str:
+    """Очистка одного значения — то же, что clean_frame делает с колонкой."""
+    if value is None or (isinstance(value, float) and value != value):
+        return ""
+    return _WS.sub(" ", str(value).strip()).strip('"')
+
+
+def clean_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Чистит все текстовые колонки и приводит дату рождения к дате."""
+    for col in df.select_dtypes(include=["object"]).columns:
+        df[col] = (
+            df[col]
+            .fillna("")
+            .str.strip()
+            .str.replace(_WS, " ", regex=True)
+            .str.strip('"')
+        )
+
+    # «1998-10-02 0:00» -> «1998-10-02»
+    if BIRTH_DATE_COLUMN in df.columns:
+        df[BIRTH_DATE_COLUMN] = pd.to_datetime(
+            df[BIRTH_DATE_COLUMN], errors="coerce"
+        ).dt.date
+
+    return df
+
+
+def _read_chunks(path: str, chunksize: int):
+    ext = os.path.splitext(path)[-1].lower()
+
+    if ext == ".csv":
+        # dtype=str: тип колонки не должен зависеть от того, что попало в кусок
+        yield from pd.read_csv(
+            path,
+            dtype=str,
+            chunksize=chunksize,
+            encoding="utf-8-sig",
+            on_bad_lines="warn",
+        )
+    elif ext == ".xlsx":
+        from openpyxl import load_workbook
+
+        wb = load_workbook(path, read_only=True)
+        try:
+            rows = wb.active.iter_rows(values_only=True)
+            header = [str(h) for h in next(rows, [])]
+            batch = []
+            for row in rows:
+                batch.append([None if v is None else str(v) for v in row])
+                if len(batch) >= chunksize:
+                    yield pd.DataFrame(batch, columns=header, dtype=object)
+                    batch = []
+            if batch:
+                yield pd.DataFrame(batch, columns=header, dtype=object)
+        finally:
+            wb.close()
+    else:
+        raise ValueError(f"Unsupported file format: {ext}")
+
+
+class _CsvWriter:
+    def __init__(self, path: str):
+        self._path = path
+        self._header = True
+
+    def write(self, df: pd.DataFrame):
+        df.to_csv(
+            self._path,
+            mode="w" if self._header else "a",
+            header=self._header,
+            index=False,
+            quoting=csv.QUOTE_ALL,
+        )
+        self._header = False
+
+    def close(self):
+        if self._header:
+            open(self._path, "w").close()
+
+
+class _XlsxWriter:
+    def __init__(self, path: str):
+        from openpyxl import Workbook
+
+        self._path = path
+        self._wb = Workbook(write_only=True)
+        self._ws = self._wb.create_sheet()
+        self._header = True
+
+    def write(self, df: pd.DataFrame):
+        if self._header:
+            self._ws.append(list(df.columns))
+            self._header = False
+        for row in df.itertuples(index=False, name=None):
+            self._ws.append(list(row))
+
+    def close(self):
+        self._wb.save(self._path)
+
+
+def _writer(path: str):
+    ext = os.path.splitext(path)[-1].lower()
+    if ext == ".csv":
+        return _CsvWriter(path)
+    if ext == ".xlsx":
+        return _XlsxWriter(path)
+    raise ValueError(f"Unsupported file format: {ext}")
+
+
+def clean_file(src: str, dst: str, chunksize: int = DEFAULT_CHUNKSIZE,
+               workers: int = 1) -> dict:
+    """Читает src кусками, чистит и дописывает в dst. Возвращает отчёт."""
+    started = time.perf_counter()
+    writer = _writer(dst)
+    report = {"rows": 0, "chunks": 0}
+
+    def emit(df):
+        writer.write(df)
+        report["rows"] += len(df)
+        report["chunks"] += 1
+
+    try:
+        if workers <= 1:
+            for chunk in _read_chunks(src, chunksize):
+                emit(clean_frame(chunk))
+        else:
+            # не больше 2 * workers кусков в полёте — память остаётся ограниченной
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                pending = deque()
+                for chunk in _read_chunks(src, chunksize):
+                    pending.append(pool.submit(clean_frame, chunk))
+                    if len(pending) >= 2 * workers:
+                        emit(pending.popleft().result())
+                while pending:
+                    emit(pending.popleft().result())
+    finally:
+        writer.close()
+
+    report["seconds"] = round(time.perf_counter() - started, 2)
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Очистка выгрузки тикетов CRM")
+    parser.add_argument("src", help="входной .csv или .xlsx")
+    parser.add_argument("-o", "--output", help="выходной .csv или .xlsx")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE)
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    dst = args.output or f"{os.path.splitext(args.src)[0]}.clean.csv"
+
+    print(f"--- Начинаю обработку файла: {args.src} ---")
+    report = clean_file(args.src, dst, chunksize=args.chunksize, workers=args.workers)
+    print(f"--- Готово! {report['rows']} строк за {report['seconds']} с, "
+          f"файл сохранен как: {dst} ---")
+
+
+if __name__ == "__main__":
+    main()
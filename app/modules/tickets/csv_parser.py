@@ -0,0 +1,95 @@
+import csv
+import io
+import uuid
+
+
+# Заголовки выгрузки CRM -> поля Ticket.
+# "Описани" — так колонка называется в реальной выгрузке (file/tickets.csv).
+HEADER_FIELDS = {
+    "GUID клиента": "guid",
+    "Пол клиента": "gender",
+    "Дата рождения": "birth_date",
+    "Описание": "description",
+    "Описани": "description",
+    "Вложения": "attachment",
+    "Сегмент клиента": "segment",
+    "Страна": "country",
+    "Область": "region",
+    "Населённый пункт": "city",
+    "Улица": "street",
+    "Дом": "house",
+}
+
+TICKET_FIELDS = [
+    "gender", "birth_date", "description", "attachment", "segment",
+    "country", "region", "city", "street", "house",
+]
+
+# То же, что pandas.read_csv по умолчанию считает пропуском
+NA_VALUES = {
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan",
+    "1.#IND", "1.#QNAN", "<NA>", "N/A", "NA", "NULL", "NaN", "None",
+    "n/a", "nan", "null",
+}
+
+# Описания бывают длинными — стандартного лимита csv (128 КБ) не хватает
+MAX_FIELD_SIZE = 16 * 1024 * 1024
+
+csv.field_size_limit(max(csv.field_size_limit(), MAX_FIELD_SIZE))
+
+
+def clean(value):
+    if value is None or value in NA_VALUES:
+        return None
+    if isinstance(value, float) and value != value:
+        return None
+    value = str(value).strip()
+    if value.lower() == "nan":
+        return None
+    return value.replace(".0", "")
+
+
+def parse_guid(value):
+    if value is None or value in NA_VALUES:
+        return None
+    try:
+        return uuid.UUID(value)
+    except ValueError:
+        return None
+
+
+def iter_ticket_records(fileobj):
+    """Потоково читает CSV-выгрузку и отдаёт по одной нормализованной записи.
+
+    fileobj — бинарный файл; декодирование идёт кусками через TextIOWrapper,
+    поэтому в памяти одновременно живёт только буфер чтения и текущая строка.
+    Для строк с битым GUID в записи будет guid=None.
+    """
+    text = io.TextIOWrapper(fileobj, encoding="utf-8-sig", newline="")
+
+    try:
+        reader = csv.reader(text)
+        header = next(reader, None)
+        if header is None:
+            return
+
+        columns = [HEADER_FIELDS.get(h.strip()) for h in header]
+
+        for row in reader:
+            if not row:
+                continue
+
+            raw = dict.fromkeys(TICKET_FIELDS)
+            raw["guid"] = None
+
+            for field, value in zip(columns, row):
+                if field:
+                    raw[field] = value
+
+            record = {f: clean(raw[f]) for f in TICKET_FIELDS}
+            record["guid"] = parse_guid(raw["guid"])
+
+            yield record
+    finally:
+        # не закрываем чужой файл вместе с обёрткой
+        text.detach()
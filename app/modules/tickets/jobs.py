@@ -0,0 +1,162 @@
+import os
+import shutil
+import socket
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from sqlalchemy.orm import Session
+
+from app.core.config import INGEST_MAX_JOBS, INGEST_CLEAN_WORKERS
+from app.core.db import SessionLocal
+from app.core.log import log
+from app.modules.tickets import repository, service
+from app.modules.tickets.cleaner import clean_file
+
+
+# Отдельный пул, чтобы долгие загрузки не занимали потоки,
+# в которых Starlette выполняет обычные sync-эндпоинты.
+_executor = ThreadPoolExecutor(
+    max_workers=INGEST_MAX_JOBS,
+    thread_name_prefix="ingest",
+)
+
+
+def save_upload(src) -> str:
+    """Копирует загруженный файл на диск: UploadFile закрывается вместе с запросом."""
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".csv") as dst:
+        shutil.copyfileobj(src, dst, length=1024 * 1024)
+        return dst.name
+
+
+def _owner() -> str:
+    # не на уровне модуля: воркеры могут форкаться после импорта
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _remove_files(path: str):
+    for p in (path, path + ".clean.csv"):
+        if os.path.exists(p):
+            os.remove(p)
+
+
+def submit_ingest_job(db: Session, path: str, filename: str | None,
+                      batch_size: int | None = None, clean: bool = False):
+    job = repository.create_ingest_job(db, filename, path=path, owner=_owner())
+    _executor.submit(run_ingest_job, job.id, path, batch_size, clean)
+    return job
+
+
+def run_ingest_job(job_id, path: str, batch_size: int | None = None,
+                   clean: bool = False):
+    db = SessionLocal()
+    cleaned = None
+
+    def on_batch(report):
+        repository.update_ingest_job(
+            db, job_id,
+            rows_parsed=report["parsed"],
+            rows_inserted=report["created"],
+            rows_skipped=report["skipped_duplicates"],
+            rows_invalid=report["invalid_rows"],
+            rows_published=report["published"],
+        )
+
+    try:
+        repository.update_ingest_job(
+            db, job_id, status="RUNNING", started_at=datetime.utcnow()
+        )
+
+        # выгрузку CRM сначала чистим в соседний файл, грузим уже его
+        if clean:
+            cleaned = path + ".clean.csv"
+            report = clean_file(path, cleaned, workers=INGEST_CLEAN_WORKERS)
+            log(f"Ingest job {job_id}: cleaned {report['rows']} rows "
+                f"in {report['seconds']} s")
+
+        with open(cleaned or path, "rb") as f:
+            service.process_csv(f, db, batch_size=batch_size, on_batch=on_batch)
+
+        repository.update_ingest_job(
+            db, job_id, status="DONE", finished_at=datetime.utcnow()
+        )
+    except Exception as e:
+        db.rollback()
+        log(f"Ingest job {job_id} failed: {e}")
+        repository.update_ingest_job(
+            db, job_id,
+            status="FAILED",
+            error=str(e),
+            finished_at=datetime.utcnow(),
+        )
+    finally:
+        db.close()
+        _remove_files(path)
+
+
+def recover_orphaned_jobs(db: Session) -> int:
+    """Помечает FAILED задачи, брошенные рестартом, и удаляет их файлы.
+
+    Задачи идут в пуле потоков процесса: после рестарта PENDING / RUNNING
+    этого хоста, чей процесс уже не жив, никто не доделает. Задачи других
+    хостов не трогаем — их файлы не здесь, а процесс может работать.
+    """
+    host = socket.gethostname()
+    recovered = 0
+
+    for job in repository.get_unfinished_ingest_jobs(db):
+        owner_host, _, pid = (job.owner or "").rpartition(":")
+        if owner_host != host or not pid.isdigit():
+            continue
+        # свой pid у задачи из прошлой жизни процесса — новые ещё не запускались
+        if int(pid) != os.getpid() and _pid_alive(int(pid)):
+            continue
+
+        job.status = "FAILED"
+        job.error = "Interrupted by restart"
+        job.finished_at = datetime.utcnow()
+        if job.path:
+            _remove_files(job.path)
+        recovered += 1
+
+    db.commit()
+    if recovered:
+        log(f"Marked {recovered} orphaned ingest job(s) as FAILED")
+    return recovered
+
+
+def job_to_dict(job):
+    elapsed = None
+    throughput = None
+
+    if job.started_at:
+        end = job.finished_at or datetime.utcnow()
+        elapsed = (end - job.started_at).total_seconds()
+        if elapsed > 0:
+            throughput = round(job.rows_parsed / elapsed, 1)
+
+    return {
+        "id": str(job.id),
+        "status": job.status,
+        "filename": job.filename,
+        "rows_parsed": job.rows_parsed,
+        "rows_inserted": job.rows_inserted,
+        "rows_skipped": job.rows_skipped,
+        "rows_invalid": job.rows_invalid,
+        "rows_published": job.rows_published,
+        "elapsed_sec": round(elapsed, 2) if elapsed is not None else None,
+        "rows_per_sec": throughput,
+        "error": job.error,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+    }
@@ -4,14 +4,17 @@ from datetime import datetime
 from sqlalchemy import (
     Column,
     Integer,
+    BigInteger,
+    Float,
     String,
     Text,
     DateTime,
     ForeignKey,
-    Enum
+    Enum,
+    Index,
 )
 from sqlalchemy.orm import declarative_base, relationship
-from sqlalchemy.dialects.postgresql import UUID, ARRAY
+from sqlalchemy.dialects.postgresql import UUID, ARRAY, JSONB
 from geoalchemy2 import Geography
 
 
@@ -36,12 +39,18 @@ class Office(Base):
 
     # PostGIS geography point
     location = Column(
-        Geography(geometry_type="POINT", srid=4326),
+        Geography(geometry_type="POINT", srid=4326, spatial_index=False),
         nullable=False,
     )
 
     managers = relationship("Manager", back_populates="office")
 
+    # GiST для KNN-поиска (<->); имя совпадает с тем, что раньше
+    # неявно создавал geoalchemy2
+    __table_args__ = (
+        Index("idx_offices_location", "location", postgresql_using="gist"),
+    )
+
 
 # =====================================================
 # MANAGER
@@ -80,6 +89,11 @@ class Manager(Base):
             return False
         return skill.strip() in self.skills
 
+    # сидер делает upsert по имени
+    __table_args__ = (
+        Index("uq_managers_name", "name", unique=True),
+    )
+
 
 # =====================================================
 # TICKET
@@ -126,6 +140,7 @@ class Ticket(Base):
     language = Column(String(5))     # RU / KZ / ENG
     summary = Column(Text)
     recommendation = Column(Text)
+    analysis_source = Column(String(20))   # llm / cache / fastpath / fallback
 
     # ===== Assignment =====
     assigned_manager_id = Column(
@@ -140,6 +155,18 @@ class Ticket(Base):
 
     processed_at = Column(DateTime, default=datetime.utcnow)
 
+    # ===== Processing =====
+    attempts = Column(Integer, default=0)
+    error_message = Column(Text)
+
+    # когда воркер взял тикет в PROCESSING; по истечении аренды тикет
+    # упавшего воркера может взять другой
+    claimed_at = Column(DateTime)
+
+    # результаты завершённых этапов (analysis / geo / office / assignment):
+    # повтор после сбоя продолжает с первого незавершённого
+    checkpoint = Column(JSONB)
+
     manager = relationship("Manager", back_populates="tickets")
     assigned_office = relationship("Office")
 
@@ -166,4 +193,125 @@ class RoundRobinState(Base):
 
     slot = Column(Integer, default=0)
 
-    office = relationship("Office")
\ No newline at end of file
+    office = relationship("Office")
+
+
+# =====================================================
+# INGEST JOB (фоновая загрузка CSV)
+# =====================================================
+
+class IngestJob(Base):
+    __tablename__ = "ingest_jobs"
+
+    id = Column(
+        UUID(as_uuid=True),
+        primary_key=True,
+        default=uuid.uuid4,
+    )
+
+    status = Column(String(20), default="PENDING")   # PENDING / RUNNING / DONE / FAILED
+    filename = Column(String(255))
+
+    rows_parsed = Column(Integer, default=0)
+    rows_inserted = Column(Integer, default=0)
+    rows_skipped = Column(Integer, default=0)
+    rows_invalid = Column(Integer, default=0)
+    rows_published = Column(Integer, default=0)
+
+    error = Column(Text)
+
+    # временный файл загрузки и процесс, который её ведёт (host:pid):
+    # после рестарта по ним находятся брошенные задачи и их файлы
+    path = Column(String(500))
+    owner = Column(String(100))
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
+
+
+# =====================================================
+# LLM ANALYSIS CACHE
+# =====================================================
+
+class AnalysisCache(Base):
+    __tablename__ = "analysis_cache"
+
+    # sha256 нормализованного описания + сегмент/страна/регион
+    key = Column(String(64), primary_key=True)
+
+    # хеш промпта и модели: при их смене старые записи не используются
+    version = Column(String(16), nullable=False)
+
+    result = Column(JSONB, nullable=False)
+    tokens = Column(Integer, default=0)
+    hits = Column(Integer, default=0)
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+    last_hit_at = Column(DateTime)
+
+
+# =====================================================
+# GEOCODE CACHE (2GIS)
+# =====================================================
+
+class GeocodeCache(Base):
+    __tablename__ = "geocode_cache"
+
+    # нормализованный адрес
+    address = Column(String(500), primary_key=True)
+
+    # NULL в обоих полях — 2GIS адрес не нашёл (негативный кэш)
+    lat = Column(Float)
+    lon = Column(Float)
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+
+# =====================================================
+# TICKET STATS (роллапы для /api/stats)
+# =====================================================
+
+class TicketStat(Base):
+    __tablename__ = "ticket_stats"
+
+    # total / priority / type / language / tone / segment / office
+    dimension = Column(String(20), primary_key=True)
+
+    # значение измерения; '' для total и priority
+    value = Column(String(255), primary_key=True, default="")
+
+    count = Column(BigInteger, nullable=False, default=0)
+
+    # сумма приоритетов — только для dimension = 'priority'
+    priority_sum = Column(BigInteger, nullable=False, default=0)
+
+
+# =====================================================
+# SEED STATE (отпечатки применённых сидов)
+# =====================================================
+
+class SeedState(Base):
+    __tablename__ = "seed_state"
+
+    name = Column(String(50), primary_key=True)       # offices / managers
+    fingerprint = Column(String(64), nullable=False)  # sha256 данных сида
+    applied_at = Column(DateTime, default=datetime.utcnow)
+
+
+# =====================================================
+# PROCESS METRICS (снимки счётчиков процессов)
+# =====================================================
+
+class ProcessMetric(Base):
+    __tablename__ = "process_metrics"
+
+    # host:pid процесса, приславшего снимок
+    process = Column(String(100), primary_key=True)
+
+    # geocode_cache / http / ...
+    name = Column(String(50), primary_key=True)
+
+    data = Column(JSONB, nullable=False)
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow)
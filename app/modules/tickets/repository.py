@@ -1,114 +1,202 @@
 from typing import Optional, Tuple, List
 from sqlalchemy.orm import Session
-from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 
-from app.modules.tickets.models import Ticket, Office
+from app.modules.tickets.models import Ticket, Office, Manager, IngestJob
 
 
 # -----------------------------
-# CREATE / EXISTS
+# CREATE
 # -----------------------------
 
-def exists_by_guid(db: Session, guid) -> bool:
-    stmt = select(Ticket.id).where(Ticket.guid == guid)
-    return db.execute(stmt).scalar_one_or_none() is not None
+def insert_tickets_bulk(db: Session, rows: List[dict]) -> List:
+    """INSERT ... ON CONFLICT (guid) DO NOTHING RETURNING id, segment для пачки строк.
 
+    Возвращает (id, segment) только реально вставленных тикетов — дубликаты
+    по guid молча пропускаются базой. Сегмент нужен для роллапов статистики.
+    """
+    if not rows:
+        return []
 
-def create_ticket(db: Session, ticket_data: dict) -> Ticket:
-    ticket = Ticket(**ticket_data)
-    db.add(ticket)
-    db.flush()
-    return ticket
+    stmt = (
+        pg_insert(Ticket)
+        .on_conflict_do_nothing(index_elements=[Ticket.guid])
+        .returning(Ticket.id, Ticket.segment)
+    )
+    return db.execute(stmt, rows).all()
+
+
+# -----------------------------
+# INGEST JOBS
+# -----------------------------
+
+def create_ingest_job(db: Session, filename: Optional[str],
+                      path: Optional[str] = None, owner: Optional[str] = None) -> IngestJob:
+    job = IngestJob(filename=filename, path=path, owner=owner)
+    db.add(job)
+    db.commit()
+    return job
+
+
+def get_unfinished_ingest_jobs(db: Session) -> List[IngestJob]:
+    stmt = select(IngestJob).where(IngestJob.status.in_(["PENDING", "RUNNING"]))
+    return db.execute(stmt).scalars().all()
+
+
+async def get_ingest_job(db: AsyncSession, job_id) -> Optional[IngestJob]:
+    return await db.get(IngestJob, job_id)
+
+
+def update_ingest_job(db: Session, job_id, **fields) -> None:
+    db.query(IngestJob).filter(IngestJob.id == job_id).update(fields)
+    db.commit()
 
 
 # -----------------------------
 # SINGLE
 # -----------------------------
 
-def get_ticket_by_id(db: Session, ticket_id: str) -> Optional[Ticket]:
-    return db.get(Ticket, ticket_id)
+async def get_ticket_detail(db: AsyncSession, ticket_id):
+    """Тикет вместе с городом офиса и данными менеджера — один запрос."""
+    stmt = (
+        select(
+            Ticket.id,
+            Ticket.guid,
+            Ticket.segment,
+            Ticket.ticket_type,
+            Ticket.tone,
+            Ticket.priority,
+            Ticket.language,
+            Ticket.city,
+            Ticket.country,
+            Ticket.processed_at,
+            Ticket.description,
+            Ticket.summary,
+            Ticket.recommendation,
+            Office.city.label("office"),
+            Manager.name.label("manager"),
+            Manager.position.label("manager_position"),
+            Manager.skills.label("manager_skills"),
+        )
+        .select_from(Ticket)
+        .outerjoin(Office, Ticket.assigned_office_id == Office.id)
+        .outerjoin(Manager, Ticket.assigned_manager_id == Manager.id)
+        .where(Ticket.id == ticket_id)
+    )
+    return (await db.execute(stmt)).first()
 
 
 # -----------------------------
 # LIST
 # -----------------------------
 
-def get_tickets(
-    db: Session,
-    office: Optional[str] = None,
-    type: Optional[str] = None,
-    language: Optional[str] = None,
-    priority_min: int = 1,
-    priority_max: int = 10,
-    limit: int = 100,
-    offset: int = 0,
-) -> Tuple[int, List[Ticket]]:
-
-    stmt = select(Ticket)
+def _list_filters(office, type, language, priority_min, priority_max) -> list:
+    filters = [
+        Ticket.priority >= priority_min,
+        Ticket.priority <= priority_max,
+    ]
 
     if office:
-        stmt = (
-            stmt.join(Office, Ticket.assigned_office_id == Office.id)
-                .where(Office.city == office)
-        )
+        filters.append(Office.city == office)
 
     if type:
-        stmt = stmt.where(Ticket.ticket_type == type)
+        filters.append(Ticket.ticket_type == type)
 
     if language:
-        stmt = stmt.where(Ticket.language == language)
+        filters.append(Ticket.language == language)
 
-    stmt = stmt.where(
-        Ticket.priority >= priority_min,
-        Ticket.priority <= priority_max
-    )
+    return filters
 
-    total_stmt = select(func.count()).select_from(stmt.subquery())
-    total = db.execute(total_stmt).scalar()
 
-    stmt = (
-        stmt.order_by(Ticket.priority.desc())
-            .offset(offset)
-            .limit(limit)
-    )
+def _count_stmt(office, filters):
+    stmt = select(func.count()).select_from(Ticket)
+    if office:
+        stmt = stmt.join(Office, Ticket.assigned_office_id == Office.id)
+    return stmt.where(*filters)
 
-    items = db.execute(stmt).scalars().all()
 
-    return total, items
+async def count_tickets(
+    db: AsyncSession,
+    office: Optional[str] = None,
+    type: Optional[str] = None,
+    language: Optional[str] = None,
+    priority_min: int = 1,
+    priority_max: int = 10,
+) -> int:
+    filters = _list_filters(office, type, language, priority_min, priority_max)
+    return (await db.execute(_count_stmt(office, filters))).scalar()
 
 
-# -----------------------------
-# STATS
-# -----------------------------
+async def estimate_tickets(
+    db: AsyncSession,
+    office: Optional[str] = None,
+    type: Optional[str] = None,
+    language: Optional[str] = None,
+    priority_min: int = 1,
+    priority_max: int = 10,
+) -> int:
+    """Оценка числа строк планировщиком (EXPLAIN) — без прохода по таблице."""
+    filters = _list_filters(office, type, language, priority_min, priority_max)
+
+    stmt = select(Ticket.id)
+    if office:
+        stmt = stmt.join(Office, Ticket.assigned_office_id == Office.id)
 
-def get_stats(db: Session):
+    conn = await db.connection()
+    compiled = stmt.where(*filters).compile(dialect=conn.dialect)
 
-    def agg(column):
-        stmt = select(column, func.count()).group_by(column)
-        return {
-            value: count
-            for value, count in db.execute(stmt).all()
-            if value
-        }
+    plan = (await conn.exec_driver_sql(
+        "EXPLAIN (FORMAT JSON) " + str(compiled), compiled.params
+    )).scalar()
+    return int(plan[0]["Plan"]["Plan Rows"])
 
-    office_stmt = (
-        select(Office.city, func.count(Ticket.id))
-        .join(Ticket, Ticket.assigned_office_id == Office.id)
-        .group_by(Office.city)
+
+async def get_tickets(
+    db: AsyncSession,
+    office: Optional[str] = None,
+    type: Optional[str] = None,
+    language: Optional[str] = None,
+    priority_min: int = 1,
+    priority_max: int = 10,
+    limit: int = 100,
+    offset: int = 0,
+    after: Optional[Tuple[int, object]] = None,
+) -> List:
+    """Страница списка: только колонки для DTO, офис и менеджер через JOIN.
+
+    Порядок — (priority DESC, id DESC). after=(priority, id) последней
+    строки предыдущей страницы даёт keyset-пагинацию: любая страница
+    стоит как первая. offset оставлен для старых клиентов.
+    """
+
+    filters = _list_filters(office, type, language, priority_min, priority_max)
+
+    if after is not None:
+        filters.append(tuple_(Ticket.priority, Ticket.id) < tuple_(*after))
+
+    stmt = (
+        select(
+            Ticket.id,
+            Ticket.guid,
+            Ticket.segment,
+            Ticket.ticket_type,
+            Ticket.tone,
+            Ticket.priority,
+            Ticket.language,
+            Office.city.label("office"),
+            Manager.name.label("manager"),
+        )
+        .select_from(Ticket)
+        .outerjoin(Office, Ticket.assigned_office_id == Office.id)
+        .outerjoin(Manager, Ticket.assigned_manager_id == Manager.id)
+        .where(*filters)
+        .order_by(Ticket.priority.desc(), Ticket.id.desc())
+        .limit(limit)
     )
 
-    by_office = {
-        city: count
-        for city, count in db.execute(office_stmt).all()
-    }
-
-    return {
-        "total": db.scalar(select(func.count(Ticket.id))),
-        "by_type": agg(Ticket.ticket_type),
-        "by_office": by_office,
-        "by_language": agg(Ticket.language),
-        "by_tone": agg(Ticket.tone),
-        "by_segment": agg(Ticket.segment),
-        "priority_avg": db.scalar(select(func.avg(Ticket.priority))),
-        "offices": db.scalars(select(Office.city)).all(),
-    }
\ No newline at end of file
+    if after is None and offset:
+        stmt = stmt.offset(offset)
+
+    return (await db.execute(stmt)).all()
@@ -1,77 +1,160 @@
+import base64
+import json
+import threading
+import time
+import uuid
+
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import INGEST_BATCH_SIZE, TICKETS_COUNT_CACHE_SEC
 from app.modules.tickets import repository
+from app.modules.tickets import stats as ticket_stats
+from app.modules.events.hub import notify
+from app.modules.tickets.csv_parser import iter_ticket_records
 
 
 # -----------------------------
 # CSV
 # -----------------------------
 
-def process_csv(contents: bytes, db: Session):
-    import pandas as pd
-    import io
-    import uuid
-    from app.infrastructure.rabbit.publisher import publish_ticket
+def process_csv(fileobj, db: Session, batch_size: int | None = None, on_batch=None):
+    """Загружает CSV из бинарного файла пачками.
 
-    df = pd.read_csv(io.StringIO(contents.decode("utf-8")), sep=",")
-    df.columns = df.columns.str.strip()
+    Файл читается потоково, так что память не зависит от его размера.
+    on_batch(report) вызывается после коммита каждой пачки — через него
+    фоновая задача обновляет прогресс.
+    """
+    from app.infrastructure.rabbit.publisher import publish_tickets
 
-    created = 0
-    ticket_ids = []
+    batch_size = batch_size or INGEST_BATCH_SIZE
 
-    for _, row in df.iterrows():
-        try:
-            ticket_guid = uuid.UUID(str(row["GUID клиента"]))
-        except Exception:
-            continue
+    report = {
+        "parsed": 0,
+        "created": 0,
+        "skipped_duplicates": 0,
+        "invalid_rows": 0,
+        "published": 0,
+        "batches": [],
+    }
 
-        if repository.exists_by_guid(db, ticket_guid):
-            continue
+    def flush(rows):
+        started = time.perf_counter()
+        inserted_rows = repository.insert_tickets_bulk(db, rows)
+        if inserted_rows:
+            delta = ticket_stats.record_ingested(db, [r.segment for r in inserted_rows])
+            notify(db, "ingest", {"stats": delta})
+        db.commit()
 
-        ticket_data = {
-            "guid": ticket_guid,
-            "gender": clean(row.get("Пол клиента")),
-            "birth_date": clean(row.get("Дата рождения")),
-            "description": clean(row.get("Описание")),
-            "attachment": clean(row.get("Вложения")),
-            "segment": clean(row.get("Сегмент клиента")),
-            "country": clean(row.get("Страна")),
-            "region": clean(row.get("Область")),
-            "city": clean(row.get("Населённый пункт")),
-            "street": clean(row.get("Улица")),
-            "house": clean(row.get("Дом")),
-        }
+        ticket_ids = [r.id for r in inserted_rows]
 
-        ticket = repository.create_ticket(db, ticket_data)
-        ticket_ids.append(ticket.id)
-        created += 1
+        report["published"] += publish_tickets(ticket_ids)
 
-    db.commit()
+        inserted = len(ticket_ids)
+        report["created"] += inserted
+        report["skipped_duplicates"] += len(rows) - inserted
+        report["batches"].append({
+            "rows": len(rows),
+            "inserted": inserted,
+            "skipped": len(rows) - inserted,
+            "ms": round((time.perf_counter() - started) * 1000, 1),
+        })
 
-    for tid in ticket_ids:
-        publish_ticket(tid)
+        if on_batch:
+            on_batch(report)
 
-    return created
+    batch = []
 
+    for record in iter_ticket_records(fileobj):
+        report["parsed"] += 1
 
-def clean(value):
-    import pandas as pd
-    if pd.isna(value):
-        return None
-    value = str(value).strip()
-    if value.lower() == "nan":
-        return None
-    return value.replace(".0", "")
+        if record["guid"] is None:
+            report["invalid_rows"] += 1
+            continue
+
+        batch.append(record)
+
+        if len(batch) >= batch_size:
+            flush(batch)
+            batch = []
+
+    if batch:
+        flush(batch)
+    elif on_batch:
+        on_batch(report)
+
+    return report
 
 
 # -----------------------------
 # LIST
 # -----------------------------
 
-def list_tickets_service(db: Session, **filters):
-    total, items = repository.get_tickets(db, **filters)
+_count_cache = {}
+_count_lock = threading.Lock()
+
+
+def encode_cursor(priority: int, ticket_id) -> str:
+    raw = json.dumps([priority, str(ticket_id)]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        priority, ticket_id = json.loads(base64.urlsafe_b64decode(padded))
+        return int(priority), uuid.UUID(ticket_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+async def _cached_count(db: AsyncSession, filters: dict) -> int:
+    key = tuple(sorted(filters.items()))
+    now = time.monotonic()
+
+    with _count_lock:
+        cached = _count_cache.get(key)
+        if cached and cached[1] > now:
+            return cached[0]
+
+    total = await repository.count_tickets(db, **filters)
+
+    with _count_lock:
+        if len(_count_cache) > 1000:
+            _count_cache.clear()
+        _count_cache[key] = (total, now + TICKETS_COUNT_CACHE_SEC)
+    return total
+
+
+async def list_tickets_service(db: AsyncSession, limit: int = 100, offset: int = 0,
+                         cursor: str | None = None, total: str = "cached",
+                         **filters):
+    """total: exact — свежий COUNT, cached — COUNT с кэшем на
+    TICKETS_COUNT_CACHE_SEC, estimate — оценка планировщика, none — не считать."""
+    after = decode_cursor(cursor) if cursor else None
+
+    items = await repository.get_tickets(
+        db, limit=limit, offset=offset, after=after, **filters
+    )
+
+    if total == "exact":
+        count = await repository.count_tickets(db, **filters)
+    elif total == "cached":
+        count = await _cached_count(db, filters)
+    elif total == "estimate":
+        count = await repository.estimate_tickets(db, **filters)
+    else:
+        count = None
+
+    next_cursor = None
+    if len(items) == limit:
+        last = items[-1]
+        next_cursor = encode_cursor(last.priority, last.id)
+
     return {
-        "total": total,
+        "total": count,
+        "total_mode": total,
         "items": [ticket_to_short(t) for t in items],
+        "next_cursor": next_cursor,
     }
 
 
@@ -79,24 +162,25 @@ def list_tickets_service(db: Session, **filters):
 # DETAIL
 # -----------------------------
 
-def ticket_detail_service(db: Session, ticket_id: str):
-    ticket = repository.get_ticket_by_id(db, ticket_id)
-    if not ticket:
+async def ticket_detail_service(db: AsyncSession, ticket_id: str):
+    row = await repository.get_ticket_detail(db, ticket_id)
+    if not row:
         return None
-    return ticket_to_full(ticket)
+    return ticket_to_full(row)
 
 
 # -----------------------------
 # STATS
 # -----------------------------
 
-def stats_service(db: Session):
-    return repository.get_stats(db)
+async def stats_service(db: AsyncSession):
+    return await ticket_stats.read_stats(db)
 
 
 # -----------------------------
 # DTO
 # -----------------------------
+# На вход — строки проекций из repository (office/manager уже подтянуты JOIN-ом)
 
 def ticket_to_short(t):
     return {
@@ -107,8 +191,8 @@ def ticket_to_short(t):
         "tone": t.tone,
         "priority": t.priority,
         "language": t.language,
-        "office": t.assigned_office.city if t.assigned_office else None,
-        "manager": t.manager.name if t.manager else None,
+        "office": t.office,
+        "manager": t.manager,
     }
 
 
@@ -123,10 +207,10 @@ def ticket_to_full(t):
         "language": t.language,
         "city": t.city,
         "country": t.country,
-        "office": t.assigned_office.city if t.assigned_office else None,
-        "manager": t.manager.name if t.manager else None,
-        "manager_position": t.manager.position if t.manager else None,
-        "manager_skills": t.manager.skills if t.manager else None,
+        "office": t.office,
+        "manager": t.manager,
+        "manager_position": t.manager_position,
+        "manager_skills": t.manager_skills,
         "processed_at": t.processed_at.isoformat() if t.processed_at else None,
         "description": t.description,
         "summary": t.summary,
@@ -0,0 +1,257 @@
+"""Роллапы статистики тикетов (таблица ticket_stats).
+
+    python -m app.modules.tickets.stats check     # сверить с полным пересчётом
+    python -m app.modules.tickets.stats rebuild   # пересобрать с нуля
+
+/api/stats читает только ticket_stats — её размер зависит от числа
+различных значений измерений, а не от числа тикетов. Счётчики
+обновляются в той же транзакции, что и сами тикеты:
+
+    загрузка CSV    -> total, segment
+    тикет стал DONE -> type, language, tone, office, priority
+
+Поэтому аналитические измерения (и средний приоритет) считают только
+DONE-тикеты, а total и segment — все загруженные.
+"""
+import sys
+from collections import Counter
+
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app.modules.tickets.models import TicketStat
+
+# измерение -> ключ ответа /api/stats
+DIMENSIONS = {
+    "type": "by_type",
+    "office": "by_office",
+    "language": "by_language",
+    "tone": "by_tone",
+    "segment": "by_segment",
+}
+
+# Один проход по tickets на все измерения. GROUPING() отличает строку
+# набора группировки от NULL-значения в самих данных.
+_RECOMPUTE_SQL = text("""
+    SELECT
+        GROUPING(t.ticket_type) = 0 AS g_type,
+        GROUPING(t.language)    = 0 AS g_language,
+        GROUPING(t.tone)        = 0 AS g_tone,
+        GROUPING(t.segment)     = 0 AS g_segment,
+        GROUPING(o.city)        = 0 AS g_office,
+        t.ticket_type, t.language, t.tone, t.segment, o.city,
+        count(*)                                        AS n,
+        count(*) FILTER (WHERE t.status = 'DONE')       AS done,
+        count(t.priority) FILTER (WHERE t.status = 'DONE') AS priority_n,
+        coalesce(sum(t.priority) FILTER (WHERE t.status = 'DONE'), 0) AS priority_sum
+    FROM tickets t
+    LEFT JOIN offices o ON o.id = t.assigned_office_id
+    GROUP BY GROUPING SETS (
+        (), (t.ticket_type), (t.language), (t.tone), (t.segment), (o.city)
+    )
+""")
+
+
+def _bump(db, deltas: Counter, priority_sums: Counter = None) -> None:
+    """Прибавляет счётчики одним INSERT ... ON CONFLICT DO UPDATE.
+
+    Ключи сортируются: параллельные транзакции берут блокировки строк
+    в одном порядке и не упираются в дедлок.
+    """
+    priority_sums = priority_sums or Counter()
+    rows = [
+        {
+            "dimension": dimension,
+            "value": value,
+            "count": count,
+            "priority_sum": priority_sums[(dimension, value)],
+        }
+        for (dimension, value), count in sorted(deltas.items())
+        if count
+    ]
+    if not rows:
+        return
+
+    stmt = pg_insert(TicketStat).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[TicketStat.dimension, TicketStat.value],
+        set_={
+            "count": TicketStat.count + stmt.excluded.count,
+            "priority_sum": TicketStat.priority_sum + stmt.excluded.priority_sum,
+        },
+    )
+    db.execute(stmt)
+
+
+def _as_response(deltas: Counter, priority_sums: Counter = None) -> dict:
+    """Приращения в форме ответа /api/stats — для live-событий дашборда."""
+    priority_sums = priority_sums or Counter()
+    delta = {}
+    for (dimension, value), count in deltas.items():
+        if dimension == "total":
+            delta["total"] = count
+        elif dimension == "priority":
+            delta["priority_count"] = count
+            delta["priority_sum"] = priority_sums[(dimension, value)]
+        else:
+            delta.setdefault(DIMENSIONS[dimension], {})[value] = count
+    return delta
+
+
+def record_ingested(db, segments: list) -> dict:
+    """Учитывает вставленные тикеты; коммитит вызывающий. Возвращает приращения."""
+    deltas = Counter({("total", ""): len(segments)})
+    deltas.update(("segment", s) for s in segments if s)
+    _bump(db, deltas)
+    return _as_response(deltas)
+
+
+def record_done(db, ticket, office_city: str) -> dict:
+    """Учитывает тикет, перешедший в DONE; коммитит вызывающий вместе с тикетом."""
+    deltas = Counter()
+    priority_sums = Counter()
+
+    for dimension, value in (
+        ("type", ticket.ticket_type),
+        ("language", ticket.language),
+        ("tone", ticket.tone),
+        ("office", office_city),
+    ):
+        if value:
+            deltas[(dimension, value)] += 1
+
+    if ticket.priority is not None:
+        deltas[("priority", "")] += 1
+        priority_sums[("priority", "")] += ticket.priority
+
+    _bump(db, deltas, priority_sums)
+    return _as_response(deltas, priority_sums)
+
+
+async def read_stats(db) -> dict:
+    """Ответ /api/stats из роллапов — без обращения к tickets (AsyncSession)."""
+    stats = {key: {} for key in DIMENSIONS.values()}
+    total = 0
+    priority_avg = None
+    priority_count = 0
+
+    rows = (await db.execute(
+        text("SELECT dimension, value, count, priority_sum FROM ticket_stats")
+    )).all()
+
+    for dimension, value, count, priority_sum in rows:
+        if dimension == "total":
+            total = count
+        elif dimension == "priority":
+            priority_avg = priority_sum / count if count else None
+            priority_count = count
+        elif dimension in DIMENSIONS and count:
+            stats[DIMENSIONS[dimension]][value] = count
+
+    offices = (await db.execute(text("SELECT city FROM offices"))).scalars().all()
+
+    return {
+        "total": total,
+        **stats,
+        "priority_avg": priority_avg,
+        "priority_count": priority_count,
+        "offices": offices,
+    }
+
+
+def recompute(db) -> dict:
+    """Полный пересчёт по tickets: {(dimension, value): (count, priority_sum)}."""
+    result = {("total", ""): (0, 0)}
+
+    for row in db.execute(_RECOMPUTE_SQL).mappings():
+        if row["g_type"]:
+            dimension, value, count = "type", row["ticket_type"], row["done"]
+        elif row["g_language"]:
+            dimension, value, count = "language", row["language"], row["done"]
+        elif row["g_tone"]:
+            dimension, value, count = "tone", row["tone"], row["done"]
+        elif row["g_segment"]:
+            dimension, value, count = "segment", row["segment"], row["n"]
+        elif row["g_office"]:
+            dimension, value, count = "office", row["city"], row["done"]
+        else:
+            result[("total", "")] = (row["n"], 0)
+            if row["priority_n"]:
+                result[("priority", "")] = (row["priority_n"], int(row["priority_sum"]))
+            continue
+
+        if value and count:
+            result[(dimension, value)] = (count, 0)
+
+    return result
+
+
+def rebuild(db) -> int:
+    """Пересобирает ticket_stats; коммитит вызывающий.
+
+    LOCK TABLE ждёт транзакции, уже успевшие прибавить счётчики, и не
+    пускает новые до коммита — пересчёт не теряет и не дублирует их.
+    """
+    db.execute(text("LOCK TABLE ticket_stats IN SHARE ROW EXCLUSIVE MODE"))
+    fresh = recompute(db)
+
+    db.execute(text("DELETE FROM ticket_stats"))
+    db.execute(
+        pg_insert(TicketStat),
+        [
+            {"dimension": d, "value": v, "count": c, "priority_sum": s}
+            for (d, v), (c, s) in sorted(fresh.items())
+        ],
+    )
+    return len(fresh)
+
+
+def check(db) -> list:
+    """Сравнивает роллапы с полным пересчётом, возвращает расхождения.
+
+    Оба чтения идут в одном снимке (REPEATABLE READ), поэтому тикеты,
+    обработанные во время проверки, ложных расхождений не дают.
+    Ожидает свежую сессию без начатой транзакции.
+    """
+    db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+
+    stored = {
+        (d, v): (c, s)
+        for d, v, c, s in db.execute(
+            text("SELECT dimension, value, count, priority_sum FROM ticket_stats")
+        ).all()
+        if c
+    }
+    fresh = recompute(db)
+    db.rollback()
+
+    return [
+        {
+            "dimension": d,
+            "value": v,
+            "stored": stored.get((d, v), (0, 0))[0],
+            "actual": fresh.get((d, v), (0, 0))[0],
+            "stored_priority_sum": stored.get((d, v), (0, 0))[1],
+            "actual_priority_sum": fresh.get((d, v), (0, 0))[1],
+        }
+        for d, v in sorted(stored.keys() | fresh.keys())
+        if stored.get((d, v), (0, 0)) != fresh.get((d, v), (0, 0))
+    ]
+
+
+if __name__ == "__main__":
+    from app.core.db import SessionLocal
+
+    command = sys.argv[1] if len(sys.argv) > 1 else "check"
+
+    with SessionLocal() as db:
+        if command == "rebuild":
+            rows = rebuild(db)
+            db.commit()
+            print(f"ticket_stats rebuilt: {rows} rows")
+        else:
+            diffs = check(db)
+            for diff in diffs:
+                print(diff)
+            print("OK" if not diffs else f"{len(diffs)} mismatch(es)")
+            sys.exit(1 if diffs else 0)
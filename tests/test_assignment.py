@@ -0,0 +1,144 @@
+import random
+import threading
+from collections import Counter
+from types import SimpleNamespace
+
+from sqlalchemy import text
+from sqlalchemy.orm import sessionmaker
+
+from app.modules.assignment import service
+from app.modules.assignment.index import AssignmentIndex
+from app.modules.tickets.models import Ticket
+from tests.conftest import seed_office
+
+
+def ticket(**fields):
+    return SimpleNamespace(**{
+        "ticket_type": "Консультация", "segment": "Mass", "language": "RU", **fields,
+    })
+
+
+def test_assign_reads_current_workload(db_session, monkeypatch):
+    monkeypatch.setattr(service, "assignment_index", AssignmentIndex())
+    _, (a, b, c) = seed_office(db_session, "Алматы", [
+        ("A", "Специалист", [], 0),
+        ("B", "Специалист", [], 0),
+        ("C", "Специалист", [], 5),
+    ])
+
+    # индекс уже загружен; workload меняет «другая реплика»
+    service.assignment_index.candidates(db_session, a.office_id, None, None, None)
+    db_session.execute(
+        text("UPDATE managers SET workload = CASE name WHEN 'A' THEN 9 ELSE workload END")
+    )
+    db_session.commit()
+
+    picked = set()
+    for _ in range(2):
+        manager, _ = service.assign_ticket(db_session, ticket(), forced_office="Алматы")
+        db_session.commit()
+        picked.add(manager.name)
+
+    assert picked == {"B", "C"}
+
+
+TYPES = ["Жалоба", "Смена данных", "Консультация", "Неработоспособность приложения"]
+SEGMENTS = ["Mass", "VIP", "Priority"]
+LANGUAGES = ["RU", "KZ", "ENG"]
+
+
+def test_parallel_assigners_do_not_lose_updates(db_engine, db_session, monkeypatch):
+    """N потоков назначают одновременно, каждый в своей транзакции;
+    итоговый workload менеджера должен совпасть с числом его назначений."""
+    monkeypatch.setattr(service, "assignment_index", AssignmentIndex())
+    for city in ("Алматы", "Астана"):
+        seed_office(db_session, city, [
+            (f"{city} {i}", position, skills, 0)
+            for i, (position, skills) in enumerate([
+                ("Специалист", []),
+                ("Специалист", ["KZ"]),
+                ("Главный специалист", ["VIP", "ENG"]),
+                ("Главный специалист", ["VIP", "KZ"]),
+            ])
+        ])
+
+    Session = sessionmaker(bind=db_engine, autoflush=False)
+    picks = Counter()
+    errors = []
+    lock = threading.Lock()
+
+    def worker(seed):
+        rnd = random.Random(seed)
+        for _ in range(50):
+            with Session() as db:
+                try:
+                    manager, _ = service.assign_ticket(
+                        db,
+                        ticket(
+                            ticket_type=rnd.choice(TYPES),
+                            segment=rnd.choice(SEGMENTS),
+                            language=rnd.choice(LANGUAGES),
+                        ),
+                        forced_office=rnd.choice(["Алматы", "Астана"]),
+                    )
+                    db.commit()
+                except Exception as e:
+                    db.rollback()
+                    errors.append(e)
+                    continue
+            with lock:
+                picks[manager.id] += 1
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert errors == []
+    workloads = dict(db_session.execute(text("SELECT id, workload FROM managers")).all())
+    assert sum(picks.values()) == 400
+    assert {mid: w for mid, w in workloads.items() if w} == dict(picks)
+
+
+def test_parallel_waves_do_not_deadlock(db_engine, db_session, monkeypatch):
+    monkeypatch.setattr(service, "assignment_index", AssignmentIndex())
+    seed_office(db_session, "Алматы", [
+        (f"M{i}", "Специалист", [], 0) for i in range(6)
+    ])
+
+    Session = sessionmaker(bind=db_engine, autoflush=False)
+    picks = Counter()
+    errors = []
+    lock = threading.Lock()
+
+    def worker(seed):
+        for _ in range(20):
+            with Session() as db:
+                wave = []
+                for priority in range(5):
+                    row = Ticket(status="PROCESSING", segment="Mass")
+                    db.add(row)
+                    db.flush()
+                    wave.append((ticket(id=row.id, priority=priority), "Алматы"))
+                try:
+                    assigned = service.assign_tickets_batch(db, wave)
+                    db.commit()
+                except Exception as e:
+                    db.rollback()
+                    errors.append(e)
+                    continue
+            with lock:
+                picks.update(manager.id for manager, _ in assigned.values())
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert errors == []
+    workloads = dict(db_session.execute(text("SELECT id, workload FROM managers")).all())
+    assert workloads == dict(picks)
+    # волны выравнивают нагрузку: разброс не больше одного тикета
+    assert max(workloads.values()) - min(workloads.values()) <= 1
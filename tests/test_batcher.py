@@ -0,0 +1,81 @@
+import threading
+import time
+
+import pytest
+
+from app.infrastructure.ai.batcher import MicroBatcher
+
+
+def echo(items):
+    return {item["id"]: item["id"] * 10 for item in items}
+
+
+def test_single_item_flushed_after_max_wait():
+    batcher = MicroBatcher(echo, max_size=4, max_wait=0.05)
+
+    started = time.perf_counter()
+    assert batcher.submit({"id": 1}) == 10
+    assert time.perf_counter() - started < 1
+
+
+def test_items_grouped_into_batches():
+    sizes = []
+
+    def handler(items):
+        sizes.append(len(items))
+        return echo(items)
+
+    batcher = MicroBatcher(handler, max_size=3, max_wait=0.5)
+    results = {}
+
+    def submit(i):
+        results[i] = batcher.submit({"id": i})
+
+    threads = [threading.Thread(target=submit, args=(i,)) for i in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(5)
+
+    assert results == {i: i * 10 for i in range(6)}
+    assert sorted(sizes) == [3, 3]
+
+
+def test_missing_result_raises():
+    batcher = MicroBatcher(lambda items: {}, max_size=2, max_wait=0.01)
+
+    with pytest.raises(KeyError):
+        batcher.submit({"id": 1})
+
+
+def test_batches_run_concurrently():
+    running = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def handler(items):
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        time.sleep(0.2)
+        with lock:
+            running -= 1
+        return echo(items)
+
+    batcher = MicroBatcher(handler, max_size=2, max_wait=0.01, workers=2)
+    results = {}
+
+    def submit(i):
+        results[i] = batcher.submit({"id": i})
+
+    threads = [threading.Thread(target=submit, args=(i,)) for i in range(4)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(5)
+
+    assert results == {i: i * 10 for i in range(4)}
+    assert peak == 2
+    assert time.perf_counter() - started < 0.39
@@ -0,0 +1,105 @@
+import json
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import text
+
+try:
+    from app.infrastructure.rabbit import consumer
+except (ImportError, AttributeError) as e:  # нет клиента LLM
+    pytest.skip(f"consumer не импортируется: {e}", allow_module_level=True)
+
+from app.modules.tickets.models import Ticket
+
+
+class FakeSession:
+    def __init__(self, ticket=None, error=None):
+        self.ticket = ticket
+        self.error = error
+        self.commits = 0
+
+    def get(self, model, ticket_id):
+        if self.error:
+            raise self.error
+        return self.ticket
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        pass
+
+
+def test_retry_delay_is_clamped(monkeypatch):
+    monkeypatch.setattr(consumer, "RETRY_DELAYS_SEC", [10, 60, 300])
+
+    assert consumer.retry_delay(0) == 10
+    assert consumer.retry_delay(1) == 10
+    assert consumer.retry_delay(3) == 300
+    assert consumer.retry_delay(7) == 300
+
+
+def test_transient_error_is_retried_then_failed():
+    ticket = SimpleNamespace(attempts=1, status="PROCESSING", error_message=None)
+
+    delay = consumer.fail_ticket(FakeSession(ticket), "t", RuntimeError("boom"))
+
+    assert delay == consumer.RETRY_DELAYS_SEC[0]
+    assert ticket.status == "RETRY"
+
+    ticket.attempts = consumer.MAX_ATTEMPTS
+    assert consumer.fail_ticket(FakeSession(ticket), "t", RuntimeError("boom")) is None
+    assert ticket.status == "FAILED"
+
+
+def test_permanent_error_fails_at_once():
+    ticket = SimpleNamespace(attempts=1, status="PROCESSING", error_message=None)
+
+    delay = consumer.fail_ticket(FakeSession(ticket), "t", consumer.PermanentError("GEO_FAILED"))
+
+    assert delay is None
+    assert ticket.status == "FAILED"
+
+
+def test_unwritable_status_is_capped_by_delivery_count():
+    session = FakeSession(error=RuntimeError("database is down"))
+
+    assert consumer.fail_ticket(session, "t", RuntimeError("x"), attempt=1) == consumer.retry_delay(1)
+    assert consumer.fail_ticket(
+        session, "t", RuntimeError("x"), attempt=consumer.MAX_ATTEMPTS
+    ) == consumer.DEAD_LETTER
+
+
+def test_malformed_ticket_id_is_dead_lettered():
+    body = json.dumps({"ticket_id": "not-a-uuid"})
+
+    assert consumer.process_message(body) == consumer.DEAD_LETTER
+
+
+def claim(session, ticket_id, lease=600):
+    attempts = session.execute(
+        consumer._CLAIM_SQL, {"id": ticket_id, "lease": lease}
+    ).scalar()
+    session.commit()
+    return attempts
+
+
+def test_claim_is_exclusive_until_lease_expires(db_session):
+    ticket = Ticket(id=uuid.uuid4(), guid=uuid.uuid4(), status="NEW")
+    db_session.add(ticket)
+    db_session.commit()
+
+    assert claim(db_session, ticket.id) == 1
+    assert claim(db_session, ticket.id) is None
+
+    db_session.execute(
+        text("UPDATE tickets SET claimed_at = now() - interval '1 hour' WHERE id = :id"),
+        {"id": ticket.id},
+    )
+    db_session.commit()
+    assert claim(db_session, ticket.id) == 2
+
+    db_session.execute(text("UPDATE tickets SET status = 'DONE' WHERE id = :id"), {"id": ticket.id})
+    db_session.commit()
+    assert claim(db_session, ticket.id, lease=0) is None
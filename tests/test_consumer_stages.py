@@ -0,0 +1,102 @@
+import threading
+import time
+import uuid
+from types import SimpleNamespace
+
+import pytest
+
+try:
+    from app.infrastructure.rabbit import consumer
+except (ImportError, AttributeError) as e:  # нет клиента LLM
+    pytest.skip(f"consumer не импортируется: {e}", allow_module_level=True)
+
+from app.infrastructure.ai.batcher import MicroBatcher
+
+
+def make_ticket(**overrides):
+    fields = dict(
+        id=uuid.uuid4(),
+        description="Не приходит смс с кодом при входе",
+        segment="Mass",
+        country="Казахстан",
+        region="Алматинская",
+        city="Алматы",
+        street="Абая",
+        house="10",
+        status="NEW",
+    )
+    fields.update(overrides)
+    return SimpleNamespace(**fields)
+
+
+@pytest.fixture
+def llm_batcher(monkeypatch):
+    seen = []
+
+    def handler(items):
+        seen.extend(items)
+        return {item["id"]: {"ticket_type": "Консультация", "source": "llm"} for item in items}
+
+    monkeypatch.setattr(
+        consumer, "_llm_batcher", MicroBatcher(handler, max_size=4, max_wait=0.01)
+    )
+    monkeypatch.setattr(consumer, "fast_path", lambda description: None)
+    monkeypatch.setattr(consumer.analysis_cache, "get", lambda *args: None)
+    monkeypatch.setattr(consumer.analysis_cache, "put", lambda *args: None)
+    return seen
+
+
+def test_stages_run_on_snapshot(llm_batcher, monkeypatch):
+    monkeypatch.setattr(consumer, "geocode_address_cached", lambda address: (43.2, 76.9))
+    ticket = make_ticket()
+
+    results, errors = consumer.run_stages({
+        "analysis": (consumer.run_analysis, consumer.stage_inputs(ticket)),
+        "geo": (consumer.run_geocode, consumer.stage_inputs(ticket)),
+    }, {})
+
+    assert errors == {}
+    assert results["analysis"]["ticket_type"] == "Консультация"
+    assert results["geo"] == [43.2, 76.9]
+    assert llm_batcher[0]["id"] == str(ticket.id)
+
+
+def test_stages_run_in_parallel(monkeypatch):
+    def slow(value):
+        time.sleep(0.3)
+        return value
+
+    started = time.perf_counter()
+    results, errors = consumer.run_stages({"analysis": (slow, 1), "geo": (slow, 2)}, {})
+
+    assert results == {"analysis": 1, "geo": 2}
+    assert time.perf_counter() - started < 0.5
+
+
+def test_timed_out_stages_do_not_starve_later_tickets(monkeypatch):
+    monkeypatch.setitem(consumer.STAGE_TIMEOUTS_SEC, "geo", 0.1)
+    release = threading.Event()
+
+    def hang(_):
+        release.wait(5)
+
+    try:
+        for _ in range(consumer.CONSUMER_CONCURRENCY + 1):
+            _, errors = consumer.run_stages({"geo": (hang, None)}, {})
+            assert isinstance(errors["geo"], consumer.StageTimeout)
+
+        results, errors = consumer.run_stages({"geo": (lambda value: value, "ok")}, {})
+        assert errors == {}
+        assert results == {"geo": "ok"}
+    finally:
+        release.set()
+
+
+def test_permanent_geo_error(monkeypatch):
+    ticket = make_ticket(city=None, street=None, house=None, region=None, country=None)
+
+    _, errors = consumer.run_stages(
+        {"geo": (consumer.run_geocode, consumer.stage_inputs(ticket))}, {}
+    )
+
+    assert isinstance(errors["geo"], consumer.PermanentError)
@@ -0,0 +1,19 @@
+from app.modules.geo import repository
+from tests.conftest import seed_office
+
+
+def test_find_nearest_offices_keeps_point_order(db_session):
+    seed_office(db_session, "Алматы", [], lat=43.238, lon=76.945)
+    seed_office(db_session, "Астана", [], lat=51.128, lon=71.430)
+
+    rows = repository.find_nearest_offices(
+        db_session, [(51.1, 71.4), (43.30, 76.90), (51.2, 71.5)]
+    )
+
+    assert [row[0] for row in rows] == ["Астана", "Алматы", "Астана"]
+    assert 5 < rows[1][2] < 10
+
+
+def test_find_nearest_offices_without_offices(db_session):
+    assert repository.find_nearest_offices(db_session, []) == []
+    assert repository.find_nearest_offices(db_session, [(51.1, 71.4)]) == [None]
@@ -0,0 +1,110 @@
+import asyncio
+import threading
+import time
+
+import httpx
+import pytest
+
+from app.infrastructure.http.client import CircuitBreaker, CircuitOpenError, HttpClient
+
+
+def make_client(handler, retries=0, failures=1):
+    client = HttpClient()
+    client.register("test", max_concurrency=4, timeout=1, retries=retries)
+    client._upstreams["test"].breaker = CircuitBreaker(failures=failures, reset_sec=0.05)
+    client._sync = httpx.Client(transport=httpx.MockTransport(handler))
+    client._async = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return client
+
+
+def open_circuit(client):
+    breaker = client._upstreams["test"].breaker
+    breaker.failure()
+    assert breaker.state == "open"
+    time.sleep(0.06)
+    assert breaker.state == "half-open"
+
+
+def test_retries_then_succeeds(monkeypatch):
+    monkeypatch.setattr(HttpClient, "_backoff", staticmethod(lambda attempt: 0))
+    statuses = iter([503, 200])
+    client = make_client(lambda request: httpx.Response(next(statuses)), retries=1, failures=5)
+
+    assert client.get("test", "http://upstream/").status_code == 200
+    stats = client.stats()["test"]
+    assert (stats["calls"], stats["failures"], stats["retries"]) == (2, 1, 1)
+
+
+def test_probe_released_after_unexpected_error():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        if len(calls) == 1:
+            raise ValueError("bug in the caller")
+        return httpx.Response(200)
+
+    client = make_client(handler)
+    open_circuit(client)
+
+    with pytest.raises(ValueError):
+        client.get("test", "http://upstream/")
+
+    assert client.get("test", "http://upstream/").status_code == 200
+    assert client._upstreams["test"].breaker.state == "closed"
+
+
+def test_probe_released_after_cancellation():
+    started = asyncio.Event()
+
+    async def handler(request):
+        started.set()
+        await asyncio.sleep(10)
+
+    async def scenario():
+        client = make_client(handler)
+        open_circuit(client)
+
+        task = asyncio.create_task(client.aget("test", "http://upstream/"))
+        await started.wait()
+        with pytest.raises(CircuitOpenError):
+            await client.aget("test", "http://upstream/")
+
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        # пробный запрос снят — следующий снова может пробовать
+        assert client._upstreams["test"].breaker.allow()
+
+    asyncio.run(scenario())
+
+
+def test_counters_are_exact_under_threads():
+    client = make_client(lambda request: httpx.Response(200))
+
+    def worker():
+        for _ in range(200):
+            client.get("test", "http://upstream/")
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert client.stats()["test"]["calls"] == 1600
+
+
+def test_latency_excludes_wait_for_a_slot():
+    client = make_client(lambda request: httpx.Response(200))
+    slots = client._upstreams["test"].sync_slots
+    for _ in range(4):
+        slots.acquire()
+    threading.Timer(0.2, lambda: slots.release()).start()
+
+    started = time.perf_counter()
+    assert client.get("test", "http://upstream/").status_code == 200
+    assert time.perf_counter() - started >= 0.2
+
+    assert client.stats()["test"]["latency"]["avg_ms"] < 100
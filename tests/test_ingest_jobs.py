@@ -0,0 +1,35 @@
+import os
+import socket
+import subprocess
+import sys
+
+from app.modules.tickets import jobs
+from app.modules.tickets.models import IngestJob
+
+
+def dead_pid() -> int:
+    proc = subprocess.Popen([sys.executable, "-c", "pass"])
+    proc.wait()
+    return proc.pid
+
+
+def test_orphaned_jobs_failed_and_files_removed(db_session, tmp_path):
+    host = socket.gethostname()
+    upload = tmp_path / "upload.csv"
+    upload.write_text("a,b\n")
+    cleaned = tmp_path / "upload.csv.clean.csv"
+    cleaned.write_text("a,b\n")
+
+    orphan = IngestJob(status="RUNNING", path=str(upload), owner=f"{host}:{dead_pid()}")
+    live = IngestJob(status="RUNNING", path=str(tmp_path / "x.csv"), owner=f"{host}:{os.getppid()}")
+    remote = IngestJob(status="PENDING", path="/tmp/y.csv", owner="other-host:1")
+    done = IngestJob(status="DONE", owner=f"{host}:{dead_pid()}")
+    db_session.add_all([orphan, live, remote, done])
+    db_session.commit()
+
+    assert jobs.recover_orphaned_jobs(db_session) == 1
+
+    db_session.expire_all()
+    assert orphan.status == "FAILED" and orphan.finished_at is not None
+    assert not upload.exists() and not cleaned.exists()
+    assert (live.status, remote.status, done.status) == ("RUNNING", "PENDING", "DONE")
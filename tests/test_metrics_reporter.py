@@ -0,0 +1,27 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy.orm import sessionmaker
+
+from app.modules.metrics import reporter, repository
+from app.modules.tickets.models import ProcessMetric
+
+
+def test_snapshots_visible_to_other_processes(db_engine, db_session, monkeypatch):
+    monkeypatch.setattr(reporter, "SessionLocal", sessionmaker(bind=db_engine))
+    counters = {"hits": 1}
+
+    metrics = reporter.MetricsReporter()
+    metrics.register("geocode_cache", lambda: dict(counters))
+    metrics.flush()
+    counters["hits"] = 5
+    metrics.flush()
+
+    db_session.add(ProcessMetric(
+        process="gone:1", name="geocode_cache", data={"hits": 99},
+        updated_at=datetime.utcnow() - timedelta(hours=1),
+    ))
+    db_session.commit()
+
+    assert repository.process_metrics(db_session, "geocode_cache", max_age_sec=60) == {
+        reporter.process_name(): {"hits": 5},
+    }
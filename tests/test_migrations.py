@@ -0,0 +1,53 @@
+import ast
+import uuid
+from pathlib import Path
+
+from sqlalchemy import text
+
+from app.db.migrations.versions import m0003_ticket_stats_backfill
+from app.modules.tickets import stats
+from app.modules.tickets.models import Ticket
+from tests.conftest import seed_office
+
+VERSIONS = Path(m0003_ticket_stats_backfill.__file__).parent
+
+
+def test_migrations_do_not_import_application_code():
+    # применённая миграция не должна менять поведение вместе с кодом приложения
+    for path in VERSIONS.glob("m[0-9]*.py"):
+        for node in ast.walk(ast.parse(path.read_text(encoding="utf-8"))):
+            if isinstance(node, ast.ImportFrom):
+                assert not (node.module or "").startswith("app"), path.name
+            elif isinstance(node, ast.Import):
+                assert not any(a.name.startswith("app") for a in node.names), path.name
+
+
+def test_stats_backfill_matches_recompute(db_session):
+    office, (manager,) = seed_office(db_session, "Алматы", [("A", "Специалист", [], 0)])
+    for i in range(12):
+        done = i % 3 != 0
+        db_session.add(Ticket(
+            id=uuid.uuid4(),
+            guid=uuid.uuid4(),
+            status="DONE" if done else "NEW",
+            segment=["Mass", "VIP", None][i % 3],
+            ticket_type="Жалоба" if done else None,
+            tone=["Нейтральный", "Негативный"][i % 2] if done else None,
+            language="RU" if done else None,
+            priority=i % 10 + 1 if done else None,
+            assigned_office_id=office.id if done else None,
+            assigned_manager_id=manager.id if done else None,
+        ))
+    db_session.commit()
+
+    for sql in m0003_ticket_stats_backfill.STATEMENTS:
+        db_session.execute(text(sql))
+    db_session.commit()
+
+    stored = {
+        (d, v): (c, s)
+        for d, v, c, s in db_session.execute(
+            text("SELECT dimension, value, count, priority_sum FROM ticket_stats")
+        ).all()
+    }
+    assert stored == stats.recompute(db_session)
@@ -0,0 +1,24 @@
+from app.modules.geo.office_index import OfficeIndex
+from tests.conftest import seed_office
+
+
+def test_nearest_from_index(db_session):
+    seed_office(db_session, "Алматы", [], lat=43.238, lon=76.945)
+    seed_office(db_session, "Астана", [], lat=51.128, lon=71.430)
+    index = OfficeIndex(refresh_sec=60)
+
+    city, _, distance_km = index.nearest(db_session, 43.30, 76.90)
+
+    assert city == "Алматы"
+    assert 5 < distance_km < 10
+
+
+def test_empty_index_reloads_when_offices_appear(db_session):
+    index = OfficeIndex(refresh_sec=60)
+    assert index.nearest(db_session, 51.1, 71.4) is None
+
+    # офисы появились уже после того, как индекс был прочитан
+    seed_office(db_session, "Астана", [], lat=51.128, lon=71.430)
+
+    city, _, _ = index.nearest(db_session, 51.1, 71.4)
+    assert city == "Астана"
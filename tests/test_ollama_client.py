@@ -0,0 +1,39 @@
+import threading
+import time
+
+import pytest
+
+try:
+    from app.infrastructure.ai import ollama_client
+except (ImportError, AttributeError) as e:  # нет клиента LLM
+    pytest.skip(f"ollama_client не импортируется: {e}", allow_module_level=True)
+
+
+def test_batch_fallback_runs_items_concurrently(monkeypatch):
+    class FailingModels:
+        def generate_content(self, **kwargs):
+            raise RuntimeError("upstream down")
+
+    monkeypatch.setattr(ollama_client.client, "models", FailingModels(), raising=False)
+
+    running = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def analyze_ticket(desc, segment, country, region):
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        time.sleep(0.1)
+        with lock:
+            running -= 1
+        return {"desc": desc}
+
+    monkeypatch.setattr(ollama_client, "analyze_ticket", analyze_ticket)
+
+    items = [{"id": i, "desc": f"тикет {i}"} for i in range(4)]
+    results = ollama_client.analyze_tickets(items)
+
+    assert results == {i: {"desc": f"тикет {i}"} for i in range(4)}
+    assert peak == 4
@@ -0,0 +1,71 @@
+import csv
+from pathlib import Path
+
+import pytest
+
+from app.infrastructure.ai.prefilter import detect_tone, fast_path
+
+TICKETS_CSV = Path(__file__).resolve().parent.parent / "file" / "tickets.csv"
+
+# Тикеты из file/tickets.csv, которые проходят быстрый путь, с ручной разметкой.
+# Любой другой тикет выборки должен уходить в LLM.
+LABELLED = {
+    "cc75c0da": "Спам",
+    "c577d3fd": "Смена данных",
+    "ba61a4e7": "Смена данных",
+    "a9f07a3d": "Смена данных",
+}
+
+
+def test_fast_path_precision_on_sample():
+    with open(TICKETS_CSV, encoding="utf-8-sig", newline="") as f:
+        rows = list(csv.DictReader(f))
+
+    decided = {
+        row["GUID клиента"][:8]: result["ticket_type"]
+        for row in rows
+        if (result := fast_path(row["Описани"])) is not None
+    }
+
+    assert decided == LABELLED
+
+
+@pytest.mark.parametrize("text", [
+    "Здравствуйте! Хочу уточнить, имеет ли Money Advisor право оказывать брокерские "
+    "услуги от имени Фридом Финанс? Или я стала жертвой мошенников",
+    "Прошу проверить ваши ли это сертификат и люди, не мошенники ли?",
+    "Подскажите, как защититься от мошенников?",
+    "Ваша компания ведет себя как мошенническая структура. Перевод на сумму "
+    "200 EUR до сих пор не на моем счету.",
+    "Бесплатно ли подписать документы на открытие счета?",
+    "Какая ставка по депозиту на год?",
+    "Я не совершал ошибок при заполнении анкеты, почему отказ?",
+])
+def test_ambiguous_tickets_go_to_llm(text):
+    assert fast_path(text) is None
+
+
+@pytest.mark.parametrize("text, ticket_type", [
+    ("С моего счета списали 500 долларов без моего ведома, заблокируйте счёт", "Мошеннические действия"),
+    ("Я не совершал эту операцию по счету", "Мошеннические действия"),
+    ("Кто-то зашел в мой аккаунт и вывел деньги", "Мошеннические действия"),
+    ("Мой аккаунт взломали, что делать", "Мошеннические действия"),
+    ("Скидки до 70% только сегодня! Жми на ссылку", "Спам"),
+    ("Хочу сменить номер телефона в профиле", "Смена данных"),
+    ("Приложение не открывается после обновления", "Неработоспособность приложения"),
+])
+def test_obvious_tickets_skip_llm(text, ticket_type):
+    result = fast_path(text)
+
+    assert result is not None
+    assert result["ticket_type"] == ticket_type
+    assert result["source"] == "fastpath"
+
+
+@pytest.mark.parametrize("text, tone", [
+    ("Мои счета заблокированы. Срочно разблокируйте!!! Вы не имеете права", "Негативный"),
+    ("Большое спасибо за быструю помощь с переводом", "Позитивный"),
+    ("Хочу сменить номер телефона. Спасибо", "Нейтральный"),
+])
+def test_tone(text, tone):
+    assert detect_tone(text) == tone
@@ -0,0 +1,75 @@
+import json
+
+import pika
+import pytest
+from pika.exceptions import NackError, StreamLostError, UnroutableError
+
+from app.infrastructure.rabbit.publisher import PublishRejectedError, TicketPublisher
+
+
+class FakeChannel:
+    is_open = True
+
+    def __init__(self, errors):
+        self.errors = errors
+        self.published = []
+
+    def queue_declare(self, **kwargs):
+        pass
+
+    def confirm_delivery(self):
+        pass
+
+    def basic_publish(self, body, **kwargs):
+        ticket_id = json.loads(body)["ticket_id"]
+        error = self.errors.pop(ticket_id, None)
+        if error is not None:
+            raise error
+        self.published.append(ticket_id)
+
+
+def connect_fake(monkeypatch, errors):
+    connections = []
+
+    class FakeConnection:
+        is_open = True
+
+        def __init__(self, params):
+            self.ch = FakeChannel(errors)
+            connections.append(self)
+
+        def channel(self):
+            return self.ch
+
+        def close(self):
+            self.is_open = False
+
+    monkeypatch.setattr(pika, "BlockingConnection", FakeConnection)
+    return connections
+
+
+def test_rejected_messages_are_reported_without_reconnecting(monkeypatch):
+    connections = connect_fake(monkeypatch, {
+        "b": UnroutableError([]),
+        "d": NackError([]),
+    })
+    publisher = TicketPublisher("amqp://test")
+
+    with pytest.raises(PublishRejectedError) as error:
+        publisher.publish_many(["a", "b", "c", "d", "e"])
+
+    assert error.value.ticket_ids == ["b", "d"]
+    assert error.value.confirmed == 3
+    assert len(connections) == 1
+    assert connections[0].ch.published == ["a", "c", "e"]
+    assert (publisher.stats()["published"], publisher.stats()["rejected"]) == (3, 2)
+
+
+def test_connection_loss_resends_only_unsent(monkeypatch):
+    connections = connect_fake(monkeypatch, {"b": StreamLostError("gone")})
+    publisher = TicketPublisher("amqp://test")
+
+    assert publisher.publish_many(["a", "b", "c"]) == 3
+    assert len(connections) == 2
+    assert connections[0].ch.published == ["a"]
+    assert connections[1].ch.published == ["b", "c"]
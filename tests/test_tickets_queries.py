@@ -0,0 +1,96 @@
+import asyncio
+import uuid
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.modules.tickets import service
+from app.modules.tickets.models import Ticket
+from tests.conftest import seed_office
+
+
+class StatementCounter:
+    def __init__(self, engine):
+        self.engine = engine
+        self.statements = []
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def __enter__(self):
+        event.listen(self.engine, "before_cursor_execute", self._record)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, "before_cursor_execute", self._record)
+
+
+def seed_tickets(db_session, n=30):
+    office, managers = seed_office(db_session, "Алматы", [
+        ("A", "Специалист", ["KZ"], 0),
+        ("B", "Главный специалист", ["VIP"], 0),
+    ])
+    ids = []
+    for i in range(n):
+        ticket = Ticket(
+            id=uuid.uuid4(),
+            guid=uuid.uuid4(),
+            status="DONE",
+            segment="Mass",
+            ticket_type="Консультация",
+            tone="Нейтральный",
+            priority=1 + i % 10,
+            language="RU",
+            description=f"тикет {i}",
+            assigned_office_id=office.id,
+            assigned_manager_id=managers[i % 2].id,
+        )
+        db_session.add(ticket)
+        ids.append(ticket.id)
+    db_session.commit()
+    return ids
+
+
+def run(async_db_engine, coro_fn):
+    async def scenario():
+        async with AsyncSession(async_db_engine, expire_on_commit=False) as db:
+            return await coro_fn(db)
+
+    with StatementCounter(async_db_engine.sync_engine) as counter:
+        result = asyncio.run(scenario())
+    return result, counter.statements
+
+
+def test_list_page_is_one_query(db_session, async_db_engine):
+    seed_tickets(db_session)
+
+    page, statements = run(async_db_engine, lambda db: service.list_tickets_service(
+        db, limit=10, total="none"
+    ))
+
+    assert len(page["items"]) == 10
+    assert all(item["office"] == "Алматы" and item["manager"] for item in page["items"])
+    assert len(statements) == 1
+
+
+def test_list_with_exact_total_adds_one_count(db_session, async_db_engine):
+    seed_tickets(db_session)
+
+    page, statements = run(async_db_engine, lambda db: service.list_tickets_service(
+        db, limit=10, total="exact"
+    ))
+
+    assert page["total"] == 30
+    assert len(statements) == 2
+
+
+def test_detail_is_one_query(db_session, async_db_engine):
+    ids = seed_tickets(db_session)
+
+    detail, statements = run(async_db_engine, lambda db: service.ticket_detail_service(
+        db, ids[0]
+    ))
+
+    assert detail["office"] == "Алматы"
+    assert detail["manager"] in {"A", "B"}
+    assert len(statements) == 1